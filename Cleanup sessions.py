@@ -7,12 +7,14 @@ Run this to:
 3. Show session statistics
 """
 
-import sqlite3
 from datetime import datetime
 
+from db_connect import connect
+
 db_path = "mlcounter.db"
 
-conn = sqlite3.connect(db_path)
+# Large page cache for the bulk deletes
+conn = connect(db_path, cache_kib=100000)
 cur = conn.cursor()
 
 print("="*60)
@@ -56,6 +58,7 @@ choice = input("\nChoose option (1-5): ").strip()
 
 if choice == "1":
     # Delete old abandoned sessions
+    cur.execute("BEGIN IMMEDIATE")
     cur.execute("""
         DELETE FROM draft_sessions 
         WHERE status = 'in_progress' 
@@ -69,6 +72,7 @@ elif choice == "2":
     # Delete all in-progress
     confirm = input(f"Delete {in_progress} in-progress sessions? (y/n): ")
     if confirm.lower() == 'y':
+        cur.execute("BEGIN IMMEDIATE")
         cur.execute("DELETE FROM draft_sessions WHERE status = 'in_progress'")
         deleted = cur.rowcount
         conn.commit()
@@ -80,6 +84,7 @@ elif choice == "3":
     # Delete ALL sessions
     confirm = input(f"⚠️  DELETE ALL {total} SESSIONS? This cannot be undone! (type 'DELETE'): ")
     if confirm == 'DELETE':
+        cur.execute("BEGIN IMMEDIATE")
         cur.execute("DELETE FROM draft_sessions")
         deleted = cur.rowcount
         
@@ -87,6 +92,10 @@ elif choice == "3":
         cur.execute("DELETE FROM sqlite_sequence WHERE name='draft_sessions'")
         
         conn.commit()
+        
+        # Compact the file after the mass delete
+        conn.isolation_level = None
+        cur.execute("VACUUM")
         print(f"\n✅ Deleted ALL {deleted} sessions and reset numbering")
     else:
         print("\n❌ Cancelled")
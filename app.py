@@ -7,38 +7,36 @@ load_dotenv()
 import os
 import sqlite3
 import json
-from datetime import datetime
-from typing import List, Optional
-from collections import defaultdict, Counter
+import threading
+from typing import Iterator, List, Optional, Tuple
+import pandas as pd
 import streamlit as st
-from draft_engine import DraftEngine
+from db_connect import connect
+from draft_engine import DraftEngine, Weights
 
 # Session Tracker imports
 from session_tracker_ui import (
     render_session_sidebar,
     render_complete_session_modal,
     add_pick_hero_button,
-    sync_session_with_draft_inputs
+    sync_session_with_draft_inputs,
+    get_session_tracker,
 )
-from session_tracker import SessionTracker
 
-# Phase 2: Visual enhancements
+# Optional: pip install orjson (faster encoding of teammates/enemies lists)
 try:
-    from visualizations import (
-        create_win_rate_chart_data,
-        create_hero_performance_data,
-        create_role_distribution_data,
-        create_enemy_encounter_data,
-        create_performance_heatmap_data,
-        render_hero_comparison_chart,
-        render_win_rate_trend,
-        render_role_distribution,
-        render_enemy_matchup_chart,
-        render_day_performance
-    )
-    VISUALIZATIONS_AVAILABLE = True
+    import orjson
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    json_dumps = json.dumps
+
+# Notes Insights page (pure stdlib + optional orjson/pyahocorasick, cheap to import)
+try:
+    from notes_analyzer_free import FreeNotesAnalyzer
+    NOTES_ANALYZER_AVAILABLE = True
 except ImportError:
-    VISUALIZATIONS_AVAILABLE = False
+    NOTES_ANALYZER_AVAILABLE = False
 
 
 # -----------------------------
@@ -59,35 +57,198 @@ DEFAULT_META = "meta.json"
 # -----------------------------
 # Database Utilities
 # -----------------------------
-@st.cache_data(show_spinner=False)
-def db_hero_list(db_path: str) -> List[str]:
+# Hot-path statements as module constants: sqlite3 keeps a per-connection
+# prepared-statement cache keyed on the SQL text, so a fixed string is parsed
+# once per connection instead of on every rerun
+# Only what a Recent Games row shows: teammates/enemies are filled from
+# game_heroes, so the JSON columns (and created_at) aren't read at all
+SQL_RECENT_GAMES = """
+    SELECT game_id, date, your_hero, your_role, result, mvp_status,
+           kills, deaths, assists, notes
+    FROM game_history 
+    ORDER BY date DESC, game_id DESC 
+    LIMIT ? OFFSET ?
+"""
+# The id list is bound as one JSON array so the text doesn't vary with page size
+SQL_GAME_HEROES = """
+    SELECT game_id, side, hero FROM game_heroes
+    WHERE game_id IN (SELECT value FROM json_each(?))
+    ORDER BY rowid
+"""
+# Finished per-hero stats plus an overall row (hero NULL) summed from the
+# roll-up; averages are over non-NULL values, matching AVG()
+SQL_HERO_STATS = """
+    WITH sums AS (
+        SELECT hero, games, wins, sum_kills, n_kills,
+               sum_deaths, n_deaths, sum_assists, n_assists
+        FROM hero_stats
+        UNION ALL
+        SELECT NULL, SUM(games), SUM(wins), SUM(sum_kills), SUM(n_kills),
+               SUM(sum_deaths), SUM(n_deaths), SUM(sum_assists), SUM(n_assists)
+        FROM hero_stats
+        HAVING SUM(games) > 0
+    ), avgs AS (
+        SELECT hero, games, wins,
+               COALESCE(1.0 * sum_kills / NULLIF(n_kills, 0), 0) AS avg_kills,
+               COALESCE(1.0 * sum_deaths / NULLIF(n_deaths, 0), 0) AS avg_deaths,
+               COALESCE(1.0 * sum_assists / NULLIF(n_assists, 0), 0) AS avg_assists
+        FROM sums
+    )
+    SELECT hero,
+           games AS total_games,
+           wins,
+           games - wins AS losses,
+           100.0 * wins / games AS win_rate,
+           avg_kills,
+           avg_deaths,
+           avg_assists,
+           (avg_kills + avg_assists) / MAX(avg_deaths, 1) AS kda
+    FROM avgs
+    ORDER BY hero
+"""
+SQL_MATCHUP_STATS = "SELECT hero, enemy, wins, games - wins FROM matchup_stats"
+SQL_INSERT_GAME = """
+    INSERT INTO game_history 
+    (date, your_hero, your_role, teammates, enemies, result, 
+     mvp_status, kills, deaths, assists, notes, notes_lc)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_UPDATE_GAME = """
+    UPDATE game_history 
+    SET date = ?,
+        your_hero = ?,
+        your_role = ?,
+        teammates = ?,
+        enemies = ?,
+        result = ?,
+        mvp_status = ?,
+        kills = ?,
+        deaths = ?,
+        assists = ?,
+        notes = ?,
+        notes_lc = ?
+    WHERE game_id = ?
+"""
+
+def _connect(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open a connection in autocommit mode with WAL and a 64MB page cache"""
+    return connect(db_path, isolation_level=None, check_same_thread=check_same_thread)
+
+@st.cache_resource(show_spinner=False)
+def get_db(db_path: str):
+    """
+    One shared connection per DB for the app helpers, kept open across reruns so
+    its page cache stays warm. Reruns may run on different threads, so callers
+    hold the returned lock while using the connection.
+    """
+    return _connect(db_path, check_same_thread=False), threading.Lock()
+
+def db_mtime(db_path: str) -> int:
+    """
+    Last-write stamp for cache keys. In WAL mode commits land in the -wal file
+    and the main file only changes on checkpoint, so take the newer of the two.
+    """
+    stamp = 0
+    for path in (db_path, db_path + "-wal"):
+        try:
+            stamp = max(stamp, os.stat(path).st_mtime_ns)
+        except OSError:
+            pass
+    return stamp
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def db_hero_list(db_path: str) -> Tuple[str, ...]:
     if not os.path.exists(db_path):
-        return []
-    conn = sqlite3.connect(db_path)
+        return ()
+    # idx_hero_nocase turns the ORDER BY into an index scan
+    conn, lock = get_db(db_path)
+    with lock:
+        rows = conn.execute("SELECT hero FROM heroes ORDER BY hero COLLATE NOCASE;").fetchall()
+    return tuple(r[0] for r in rows)
+
+@st.cache_resource(show_spinner=False)
+def get_engine(db_path: str, meta_path: str) -> Tuple[DraftEngine, threading.Lock]:
+    """One long-lived engine per (db, meta) so the connection, its page cache
+    and the parsed meta.json survive reruns. Weights and tables are applied
+    per run via engine.set_weights()/preload_*(), which mutate the shared
+    engine: hold the lock from set_weights() through recommend(). The
+    connection is opened with check_same_thread=False because reruns may land
+    on a different script thread."""
+    return DraftEngine(db_path=db_path, meta_path=meta_path, weights={}), threading.Lock()
+
+@st.cache_resource(show_spinner=False)
+def get_notes_analyzer(db_path: str):
+    """One FreeNotesAnalyzer per DB (connection + compiled patterns reused across
+    reruns). Only call when NOTES_ANALYZER_AVAILABLE."""
+    return FreeNotesAnalyzer(db_path)
+
+@st.cache_data(show_spinner=False, ttl=300)
+def load_notes_bundle(db_path: str, mtime: int):
+    """Every note plus win count and hero index, refetched only when the DB changes"""
+    return get_notes_analyzer(db_path).get_notes_bundle()
+
+@st.cache_resource(show_spinner=False)
+def gemini_enabled() -> bool:
+    """One-shot probe for gemini_analyzer and its google-generativeai dependency
+    (kept lazy: importing google.generativeai is slow and only this page needs it)"""
     try:
+        from gemini_analyzer import GEMINI_AVAILABLE
+    except ImportError:
+        return False
+    return GEMINI_AVAILABLE
+
+@st.cache_resource(show_spinner=False)
+def get_gemini_analyzer(api_key: str, db_path: str):
+    from gemini_analyzer import GeminiNotesAnalyzer
+    return GeminiNotesAnalyzer(api_key, db_path=db_path)
+
+def load_matchup_table(db_path: str) -> dict:
+    """
+    Read the matchup_stats roll-up into {(hero, enemy): (wins, losses)}.
+    Cached until the DB changes, like load_hero_aggregates().
+    """
+    return _matchup_table(db_path, db_mtime(db_path))
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _matchup_table(db_path: str, mtime: int) -> dict:
+    conn, lock = get_db(db_path)
+    with lock:
+        rows = conn.execute(SQL_MATCHUP_STATS).fetchall()
+    return {(hero, enemy): (wins, losses) for hero, enemy, wins, losses in rows}
+
+def clear_history_caches():
+    """Drop cached game_history aggregates after a write"""
+    _matchup_table.clear()
+    _hero_aggregates.clear()
+    _count_games.clear()
+    cached_recommend.clear()
+    _cached_hero_stats.clear()
+    _cached_game_history.clear()
+    _cached_hero_counts.clear()
+    _cached_daily_results.clear()
+    _cached_win_rate.clear()
+    _cached_role_distribution.clear()
+    _cached_hero_performance.clear()
+    _cached_enemy_encounters.clear()
+    _cached_day_performance.clear()
+    load_notes_bundle.clear()
+
+def pick_default_pool(hero_set: frozenset, candidates: List[str]) -> List[str]:
+    return [h for h in candidates if h in hero_set]
+
+def lower_notes(notes: Optional[str]) -> Optional[str]:
+    """notes_lc value for a note (None stays None)"""
+    return notes.lower() if notes is not None else None
+
+@st.cache_resource(show_spinner=False)
+def ensure_game_history_table(db_path: str) -> bool:
+    """Ensure game_history (and its side tables/indexes) exist; runs once per process per DB"""
+    conn, lock = get_db(db_path)
+    with lock:
         cur = conn.cursor()
-        cur.execute("SELECT hero FROM heroes ORDER BY hero COLLATE NOCASE;")
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
-
-def pick_default_pool(hero_list: List[str], candidates: List[str]) -> List[str]:
-    s = set(hero_list)
-    return [h for h in candidates if h in s]
-
-def ensure_game_history_table(db_path: str):
-    """Ensure game_history table exists"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='game_history'
-    """)
-    
-    if not cur.fetchone():
-        cur.execute("""
-            CREATE TABLE game_history (
+        cur.executescript("""
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS game_history (
                 game_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 date TEXT NOT NULL,
                 your_hero TEXT NOT NULL,
@@ -100,179 +261,624 @@ def ensure_game_history_table(db_path: str):
                 deaths INTEGER,
                 assists INTEGER,
                 notes TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                notes_lc TEXT
+            );
+            -- (your_hero, date) serves hero filters/GROUP BY your_hero and the
+            -- per-hero newest-first order; it supersedes the old idx_gh_hero.
+            -- idx_gh_date already covers ORDER BY date DESC, game_id DESC
+            -- (game_id is the rowid, the implicit last index column).
+            CREATE INDEX IF NOT EXISTS idx_gh_hero_date ON game_history(your_hero, date DESC);
+            DROP INDEX IF EXISTS idx_gh_hero;
+            CREATE INDEX IF NOT EXISTS idx_gh_date ON game_history(date);
+            -- Serves the notes analyzer (noted games, newest first)
+            CREATE INDEX IF NOT EXISTS idx_game_history_notes
+            ON game_history(your_hero, date DESC)
+            WHERE notes IS NOT NULL AND LENGTH(notes) >= 10;
+
+            -- Normalized side table: one row per (game, side, hero). The JSON
+            -- columns stay the write format; triggers keep this table in sync so
+            -- every writer (log/edit here, session tracker copies) is covered.
+            CREATE TABLE IF NOT EXISTS game_heroes (
+                game_id INTEGER NOT NULL,
+                side TEXT NOT NULL CHECK(side IN ('team', 'enemy')),
+                hero TEXT NOT NULL,
+                PRIMARY KEY (game_id, side, hero)
+            );
+            CREATE INDEX IF NOT EXISTS idx_gh_hero_side ON game_heroes(hero, side);
+
+            CREATE TRIGGER IF NOT EXISTS trg_game_heroes_insert
+            AFTER INSERT ON game_history
+            BEGIN
+                INSERT OR IGNORE INTO game_heroes (game_id, side, hero)
+                SELECT NEW.game_id, 'team', value FROM json_each(NEW.teammates)
+                WHERE json_valid(NEW.teammates);
+                INSERT OR IGNORE INTO game_heroes (game_id, side, hero)
+                SELECT NEW.game_id, 'enemy', value FROM json_each(NEW.enemies)
+                WHERE json_valid(NEW.enemies);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_game_heroes_update
+            AFTER UPDATE OF teammates, enemies ON game_history
+            BEGIN
+                DELETE FROM game_heroes WHERE game_id = OLD.game_id;
+                INSERT OR IGNORE INTO game_heroes (game_id, side, hero)
+                SELECT NEW.game_id, 'team', value FROM json_each(NEW.teammates)
+                WHERE json_valid(NEW.teammates);
+                INSERT OR IGNORE INTO game_heroes (game_id, side, hero)
+                SELECT NEW.game_id, 'enemy', value FROM json_each(NEW.enemies)
+                WHERE json_valid(NEW.enemies);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_game_heroes_delete
+            AFTER DELETE ON game_history
+            BEGIN
+                DELETE FROM game_heroes WHERE game_id = OLD.game_id;
+            END;
+            COMMIT;
         """)
-        conn.commit()
+
+        # Roll-up tables: per-hero sums and per-(hero, enemy) counts, kept
+        # current by triggers inside each writer's own transaction, so reads
+        # are primary-key lookups instead of GROUP BYs over game_history
+        cur.executescript("""
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS hero_stats (
+                hero TEXT PRIMARY KEY,
+                games INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                sum_kills INTEGER NOT NULL, n_kills INTEGER NOT NULL,
+                sum_deaths INTEGER NOT NULL, n_deaths INTEGER NOT NULL,
+                sum_assists INTEGER NOT NULL, n_assists INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS matchup_stats (
+                hero TEXT NOT NULL,
+                enemy TEXT NOT NULL,
+                games INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                PRIMARY KEY (hero, enemy)
+            ) WITHOUT ROWID;
+
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_insert
+            AFTER INSERT ON game_history
+            BEGIN
+                INSERT INTO hero_stats VALUES (
+                    NEW.your_hero, 1, NEW.result = 'Win',
+                    COALESCE(NEW.kills, 0), NEW.kills IS NOT NULL,
+                    COALESCE(NEW.deaths, 0), NEW.deaths IS NOT NULL,
+                    COALESCE(NEW.assists, 0), NEW.assists IS NOT NULL
+                )
+                ON CONFLICT(hero) DO UPDATE SET
+                    games = games + 1,
+                    wins = wins + excluded.wins,
+                    sum_kills = sum_kills + excluded.sum_kills,
+                    n_kills = n_kills + excluded.n_kills,
+                    sum_deaths = sum_deaths + excluded.sum_deaths,
+                    n_deaths = n_deaths + excluded.n_deaths,
+                    sum_assists = sum_assists + excluded.sum_assists,
+                    n_assists = n_assists + excluded.n_assists;
+                INSERT INTO matchup_stats (hero, enemy, games, wins)
+                SELECT DISTINCT NEW.your_hero, value, 1, NEW.result = 'Win'
+                FROM json_each(NEW.enemies)
+                WHERE json_valid(NEW.enemies) AND value IS NOT NULL
+                ON CONFLICT(hero, enemy) DO UPDATE SET
+                    games = games + 1,
+                    wins = wins + excluded.wins;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_delete
+            AFTER DELETE ON game_history
+            BEGIN
+                UPDATE hero_stats SET
+                    games = games - 1,
+                    wins = wins - (OLD.result = 'Win'),
+                    sum_kills = sum_kills - COALESCE(OLD.kills, 0),
+                    n_kills = n_kills - (OLD.kills IS NOT NULL),
+                    sum_deaths = sum_deaths - COALESCE(OLD.deaths, 0),
+                    n_deaths = n_deaths - (OLD.deaths IS NOT NULL),
+                    sum_assists = sum_assists - COALESCE(OLD.assists, 0),
+                    n_assists = n_assists - (OLD.assists IS NOT NULL)
+                WHERE hero = OLD.your_hero;
+                DELETE FROM hero_stats WHERE hero = OLD.your_hero AND games <= 0;
+                UPDATE matchup_stats SET
+                    games = games - 1,
+                    wins = wins - (OLD.result = 'Win')
+                WHERE hero = OLD.your_hero AND enemy IN (
+                    SELECT value FROM json_each(OLD.enemies) WHERE json_valid(OLD.enemies)
+                );
+                DELETE FROM matchup_stats WHERE hero = OLD.your_hero AND games <= 0;
+            END;
+
+            -- An edit is the delete of the old row plus the insert of the new one
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_update
+            AFTER UPDATE OF your_hero, result, kills, deaths, assists, enemies ON game_history
+            BEGIN
+                UPDATE hero_stats SET
+                    games = games - 1,
+                    wins = wins - (OLD.result = 'Win'),
+                    sum_kills = sum_kills - COALESCE(OLD.kills, 0),
+                    n_kills = n_kills - (OLD.kills IS NOT NULL),
+                    sum_deaths = sum_deaths - COALESCE(OLD.deaths, 0),
+                    n_deaths = n_deaths - (OLD.deaths IS NOT NULL),
+                    sum_assists = sum_assists - COALESCE(OLD.assists, 0),
+                    n_assists = n_assists - (OLD.assists IS NOT NULL)
+                WHERE hero = OLD.your_hero;
+                DELETE FROM hero_stats WHERE hero = OLD.your_hero AND games <= 0;
+                UPDATE matchup_stats SET
+                    games = games - 1,
+                    wins = wins - (OLD.result = 'Win')
+                WHERE hero = OLD.your_hero AND enemy IN (
+                    SELECT value FROM json_each(OLD.enemies) WHERE json_valid(OLD.enemies)
+                );
+                DELETE FROM matchup_stats WHERE hero = OLD.your_hero AND games <= 0;
+                INSERT INTO hero_stats VALUES (
+                    NEW.your_hero, 1, NEW.result = 'Win',
+                    COALESCE(NEW.kills, 0), NEW.kills IS NOT NULL,
+                    COALESCE(NEW.deaths, 0), NEW.deaths IS NOT NULL,
+                    COALESCE(NEW.assists, 0), NEW.assists IS NOT NULL
+                )
+                ON CONFLICT(hero) DO UPDATE SET
+                    games = games + 1,
+                    wins = wins + excluded.wins,
+                    sum_kills = sum_kills + excluded.sum_kills,
+                    n_kills = n_kills + excluded.n_kills,
+                    sum_deaths = sum_deaths + excluded.sum_deaths,
+                    n_deaths = n_deaths + excluded.n_deaths,
+                    sum_assists = sum_assists + excluded.sum_assists,
+                    n_assists = n_assists + excluded.n_assists;
+                INSERT INTO matchup_stats (hero, enemy, games, wins)
+                SELECT DISTINCT NEW.your_hero, value, 1, NEW.result = 'Win'
+                FROM json_each(NEW.enemies)
+                WHERE json_valid(NEW.enemies) AND value IS NOT NULL
+                ON CONFLICT(hero, enemy) DO UPDATE SET
+                    games = games + 1,
+                    wins = wins + excluded.wins;
+            END;
+            COMMIT;
+        """)
+
+        # notes_lc holds the notes lowercased by the writers (str.lower(), so
+        # non-ASCII text matches too; SQL LOWER() only folds ASCII). Add it
+        # to older tables, and redo rows filled by the old LOWER() triggers
+        columns = {row[1] for row in cur.execute("PRAGMA table_info(game_history)")}
+        sql_lowered = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+            "AND name = 'trg_game_history_notes_lc_insert'"
+        ).fetchone()
+        if 'notes_lc' not in columns or sql_lowered:
+            with conn:
+                conn.execute("BEGIN")
+                if 'notes_lc' not in columns:
+                    conn.execute("ALTER TABLE game_history ADD COLUMN notes_lc TEXT")
+                conn.execute("DROP TRIGGER IF EXISTS trg_game_history_notes_lc_insert")
+                conn.execute("DROP TRIGGER IF EXISTS trg_game_history_notes_lc_update")
+                rows = conn.execute(
+                    "SELECT game_id, notes FROM game_history WHERE notes IS NOT NULL"
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE game_history SET notes_lc = ? WHERE game_id = ?",
+                    [(lower_notes(notes), game_id) for game_id, notes in rows],
+                )
+
+        # Backfill games logged before game_heroes existed
+        if cur.execute("SELECT 1 FROM game_heroes LIMIT 1").fetchone() is None:
+            cur.executescript("""
+                BEGIN;
+                INSERT OR IGNORE INTO game_heroes (game_id, side, hero)
+                SELECT g.game_id, 'team', je.value
+                FROM game_history g, json_each(g.teammates) je
+                WHERE json_valid(g.teammates)
+                ORDER BY g.game_id, je.key;
+                INSERT OR IGNORE INTO game_heroes (game_id, side, hero)
+                SELECT g.game_id, 'enemy', je.value
+                FROM game_history g, json_each(g.enemies) je
+                WHERE json_valid(g.enemies)
+                ORDER BY g.game_id, je.key;
+                COMMIT;
+            """)
+
+        # Backfill the roll-ups from games logged before they existed
+        if cur.execute("SELECT 1 FROM hero_stats LIMIT 1").fetchone() is None:
+            cur.executescript("""
+                BEGIN;
+                DELETE FROM matchup_stats;
+                INSERT INTO hero_stats
+                SELECT your_hero, COUNT(*), SUM(result = 'Win'),
+                       COALESCE(SUM(kills), 0), COUNT(kills),
+                       COALESCE(SUM(deaths), 0), COUNT(deaths),
+                       COALESCE(SUM(assists), 0), COUNT(assists)
+                FROM game_history
+                GROUP BY your_hero;
+                INSERT INTO matchup_stats (hero, enemy, games, wins)
+                SELECT g.your_hero, gh.hero, COUNT(*), SUM(g.result = 'Win')
+                FROM game_heroes gh
+                JOIN game_history g ON g.game_id = gh.game_id
+                WHERE gh.side = 'enemy'
+                GROUP BY g.your_hero, gh.hero;
+                COMMIT;
+            """)
+
+        # Planner statistics for the indexes above (indexes without stats can
+        # still lose to a scan); only on first run, later runs keep them
+        has_stats = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).fetchone() and cur.execute(
+            "SELECT 1 FROM sqlite_stat1 WHERE tbl = 'game_history' LIMIT 1"
+        ).fetchone()
+        if not has_stats:
+            cur.execute("ANALYZE game_history")
+        
+        try:
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_hero_nocase ON heroes(hero COLLATE NOCASE)")
+        except sqlite3.OperationalError:
+            # No heroes table yet (build_db.py not run)
+            pass
     
-    conn.close()
+    return True
+
+def _attach_game_heroes(cur: sqlite3.Cursor, games: List[dict]) -> List[dict]:
+    """Fill each game's teammates/enemies lists from game_heroes (pick order)"""
+    by_id = {}
+    for game in games:
+        game['teammates'] = []
+        game['enemies'] = []
+        by_id[game['game_id']] = game
+    if not by_id:
+        return games
+    
+    cur.execute(SQL_GAME_HEROES, (json_dumps(list(by_id)),))
+    for game_id, side, hero in cur.fetchall():
+        by_id[game_id]['teammates' if side == 'team' else 'enemies'].append(hero)
+    return games
 
 def log_game(db_path: str, game_data: dict):
     """Insert a game record into the database"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        INSERT INTO game_history 
-        (date, your_hero, your_role, teammates, enemies, result, 
-         mvp_status, kills, deaths, assists, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        game_data['date'],
-        game_data['your_hero'],
-        game_data['your_role'],
-        json.dumps(game_data['teammates']),
-        json.dumps(game_data['enemies']),
-        game_data['result'],
-        game_data.get('mvp_status'),
-        game_data.get('kills'),
-        game_data.get('deaths'),
-        game_data.get('assists'),
-        game_data.get('notes', '')
+    log_games_bulk(db_path, [game_data])
+
+def log_games_bulk(db_path: str, games: List[dict]):
+    """Insert many game records in one transaction"""
+    conn, lock = get_db(db_path)
+    with lock:
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(SQL_INSERT_GAME, [(
+                g['date'],
+                g['your_hero'],
+                g['your_role'],
+                json_dumps(g['teammates']),
+                json_dumps(g['enemies']),
+                g['result'],
+                g.get('mvp_status'),
+                g.get('kills'),
+                g.get('deaths'),
+                g.get('assists'),
+                g.get('notes', ''),
+                lower_notes(g.get('notes', ''))
+            ) for g in games])
+    clear_history_caches()
+
+# Nullable integer columns keep None (not NaN floats) when read through pandas
+_HISTORY_DTYPES = {'kills': 'Int64', 'deaths': 'Int64', 'assists': 'Int64'}
+
+def get_game_history(db_path: str, limit: int = 50, offset: int = 0) -> List[dict]:
+    """Retrieve game history (newest first, one page of `limit` rows)"""
+    conn, lock = get_db(db_path)
+    with lock:
+        df = pd.read_sql_query(
+            SQL_RECENT_GAMES, conn, params=(limit, offset), dtype=_HISTORY_DTYPES
+        )
+        
+        # Display strings for the Recent Games rows, built column-wise once
+        # instead of per row on every render
+        kda = df[['kills', 'deaths', 'assists']].astype('string').fillna('None')
+        df['kda_str'] = (kda['kills'] + '/' + kda['deaths'] + '/' + kda['assists']).where(
+            df['kills'].notna(), 'N/A'
+        )
+        df['result_icon'] = df['result'].eq('Win').map({True: '🟢', False: '🔴'})
+        
+        # Callers still expect plain dicts with None for missing values
+        games = df.astype(object).where(df.notna(), None).to_dict('records')
+        return _attach_game_heroes(conn.cursor(), games)
+
+EMPTY_HERO_STATS = {
+    'total_games': 0,
+    'wins': 0,
+    'losses': 0,
+    'win_rate': 0,
+    'avg_kills': 0,
+    'avg_deaths': 0,
+    'avg_assists': 0,
+    'kda': 0,
+}
+
+def load_hero_aggregates(db_path: str) -> dict:
+    """
+    {hero: stats dict} for every hero you've played, plus the overall stats
+    under the None key, all computed in one query over the hero_stats
+    roll-up. Cached until the DB changes (including writes from the session
+    tracker, which don't go through clear_history_caches()).
+    """
+    return _hero_aggregates(db_path, db_mtime(db_path))
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _hero_aggregates(db_path: str, mtime: int) -> dict:
+    conn, lock = get_db(db_path)
+    with lock:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row  # cursor-level: the connection is shared
+        rows = cur.execute(SQL_HERO_STATS).fetchall()
+    table = {}
+    for row in rows:
+        stats = dict(row)
+        table[stats.pop('hero')] = stats
+    return table
+
+def load_all_hero_stats(db_path: str) -> dict:
+    """Per-hero stats for every hero, from load_hero_aggregates()"""
+    return {
+        hero: stats
+        for hero, stats in load_hero_aggregates(db_path).items()
+        if hero is not None
+    }
+
+@st.cache_data(show_spinner=False, ttl=600)
+def cached_recommend(
+    db_path: str,
+    mtime: int,
+    meta_path: str,
+    pool: tuple,
+    enemies: tuple,
+    teammates: tuple,
+    base_score: float,
+    top_n: int,
+    use_inverse: bool,
+    use_personal: bool,
+    weights: Weights,
+) -> list:
+    """engine.recommend() memoized on its (hashable, tuple-only) inputs and the
+    DB mtime, so games saved from the session tracker show up immediately"""
+    matchups = load_matchup_table(db_path)
+    personal = {
+        hero: (stats['total_games'], stats['wins'])
+        for hero, stats in load_all_hero_stats(db_path).items()
+    }
+    engine, lock = get_engine(db_path, meta_path)
+    # The engine is shared by every session: another session's weights or
+    # tables must not land between these calls
+    with lock:
+        engine.set_weights(weights)
+        engine.preload_matchups(matchups)
+        engine.preload_personal_stats(personal)
+        return engine.recommend(
+            pool=list(pool),
+            enemies=list(enemies),
+            teammates=list(teammates),
+            base_score=base_score,
+            top_n=top_n,
+            use_inverse=use_inverse,
+            use_personal=use_personal,
+            use_synergy=False,
+        )
+
+def get_hero_stats(db_path: str, hero: Optional[str] = None) -> dict:
+    """Get win rate and performance stats for a hero (or overall, if no hero)"""
+    stats = load_hero_aggregates(db_path).get(hero or None)
+    return dict(stats) if stats else dict(EMPTY_HERO_STATS)
+
+def count_games(db_path: str) -> int:
+    """Total games logged (0 on a fresh DB), cached until the DB changes"""
+    return _count_games(db_path, db_mtime(db_path))
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _count_games(db_path: str, mtime: int) -> int:
+    # hero_stats is the trigger-maintained counter: one row per hero played,
+    # so this never touches game_history
+    conn, lock = get_db(db_path)
+    with lock:
+        return conn.execute("SELECT COALESCE(SUM(games), 0) FROM hero_stats").fetchone()[0]
+
+def get_hero_game_counts(db_path: str) -> dict:
+    """{hero: games} for every hero you've played, most played first"""
+    return dict(sorted(
+        ((hero, stats['total_games']) for hero, stats in load_all_hero_stats(db_path).items()),
+        key=lambda item: item[1],
+        reverse=True,
     ))
+
+def get_hero_performance(db_path: str, min_games: int = 3) -> List[dict]:
+    """Hero comparison rows (same shape as visualizations.create_hero_performance_data)"""
+    rows = []
+    for hero, stats in load_all_hero_stats(db_path).items():
+        if stats['total_games'] < min_games:
+            continue
+        rows.append({'hero': hero, **stats})
+    rows.sort(key=lambda h: h['total_games'], reverse=True)
+    return rows
+
+# Page-level caches keyed on (db_path, mtime): unrelated widget reruns hit the
+# cache; any write bumps mtime (and clear_history_caches() drops them outright)
+@st.cache_data(show_spinner=False, ttl=300)
+def _cached_hero_stats(db_path: str, mtime: int, hero: Optional[str] = None) -> dict:
+    return get_hero_stats(db_path, hero)
+
+@st.cache_data(show_spinner=False, ttl=300)
+def _cached_game_history(db_path: str, mtime: int, limit: int, offset: int = 0) -> List[dict]:
+    return get_game_history(db_path, limit=limit, offset=offset)
+
+def iter_game_history(db_path: str, mtime: int, pages: int, page_size: int) -> Iterator[dict]:
+    """Yield the first `pages` pages of history (newest first), reading one
+    cached page at a time so rendering starts before later pages are fetched"""
+    for page_no in range(pages):
+        page = _cached_game_history(db_path, mtime, page_size, page_no * page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+
+@st.cache_data(show_spinner=False, ttl=300)
+def _cached_hero_counts(db_path: str, mtime: int) -> dict:
+    return get_hero_game_counts(db_path)
+
+# Chart data builders for the Game History tabs (visualizations.py is only
+# imported when one of these actually runs). Widget params are part of the key.
+@st.cache_data(show_spinner=False, ttl=600)
+def _cached_daily_results(db_path: str, mtime: int) -> List[tuple]:
+    from visualizations import create_daily_result_data
+    return create_daily_result_data(get_db(db_path))
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _cached_win_rate(db_path: str, mtime: int, days: int) -> dict:
+    # Every Trends preset is a slice of the same 90-day daily buckets
+    from visualizations import (
+        WIN_RATE_MAX_DAYS, create_win_rate_chart_data, win_rate_chart_from_daily
+    )
+    if days > WIN_RATE_MAX_DAYS:
+        return create_win_rate_chart_data(get_db(db_path), days=days)
+    return win_rate_chart_from_daily(_cached_daily_results(db_path, mtime), days)
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _cached_role_distribution(db_path: str, mtime: int) -> dict:
+    from visualizations import create_role_distribution_data
+    return create_role_distribution_data(get_db(db_path))
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _cached_hero_performance(db_path: str, mtime: int, min_games: int) -> List[dict]:
+    return get_hero_performance(db_path, min_games=min_games)
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _cached_enemy_encounters(db_path: str, mtime: int, top_n: int) -> List[dict]:
+    from visualizations import create_enemy_encounter_data
+    return create_enemy_encounter_data(get_db(db_path), top_n=top_n)
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _cached_day_performance(db_path: str, mtime: int) -> List[dict]:
+    from visualizations import create_performance_heatmap_data
+    return create_performance_heatmap_data(get_db(db_path))
+
+# Game History tabs that own widgets run as fragments: moving their slider /
+# selectbox reruns only the tab body, not the whole page and the other tabs
+@st.fragment
+def render_hero_performance_tab(db_path: str, mtime: int):
+    from visualizations import hero_performance_frame, render_hero_comparison_chart
     
-    conn.commit()
-    conn.close()
-
-def get_game_history(db_path: str, limit: int = 50) -> List[dict]:
-    """Retrieve game history"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT * FROM game_history 
-        ORDER BY date DESC, game_id DESC 
-        LIMIT ?
-    """, (limit,))
-    
-    rows = cur.fetchall()
-    conn.close()
+    min_games = st.slider("Minimum games to show", 1, 10, 3, key="gh_min_games")
+    heroes_data = _cached_hero_performance(db_path, mtime, min_games)
     
-    games = []
-    for row in rows:
-        game = dict(row)
-        game['teammates'] = json.loads(game['teammates']) if game['teammates'] else []
-        game['enemies'] = json.loads(game['enemies']) if game['enemies'] else []
-        games.append(game)
+    render_hero_comparison_chart(heroes_data)
     
-    return games
+    # Detailed hero stats table (one dataframe instead of a container per hero)
+    if heroes_data:
+        with st.expander("📋 Detailed Hero Statistics"):
+            st.dataframe(
+                hero_performance_frame(heroes_data),
+                column_order=("total_games", "wins", "losses", "win_rate", "kda",
+                              "avg_kills", "avg_deaths", "avg_assists"),
+                use_container_width=True,
+                column_config={
+                    "total_games": st.column_config.NumberColumn("Games"),
+                    "wins": st.column_config.NumberColumn("W"),
+                    "losses": st.column_config.NumberColumn("L"),
+                    "win_rate": st.column_config.ProgressColumn(
+                        "Win Rate", format="%.1f%%", min_value=0.0, max_value=100.0
+                    ),
+                    "kda": st.column_config.NumberColumn("KDA", format="%.2f"),
+                    "avg_kills": st.column_config.NumberColumn("K", format="%.1f"),
+                    "avg_deaths": st.column_config.NumberColumn("D", format="%.1f"),
+                    "avg_assists": st.column_config.NumberColumn("A", format="%.1f"),
+                },
+            )
 
-def get_hero_stats(db_path: str, hero: Optional[str] = None) -> dict:
-    """Get win rate and performance stats for a hero"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
+@st.fragment
+def render_trends_tab(db_path: str, mtime: int):
+    from visualizations import render_day_performance, render_win_rate_trend
     
-    if hero:
-        cur.execute("""
-            SELECT 
-                COUNT(*) as total_games,
-                SUM(CASE WHEN result = 'Win' THEN 1 ELSE 0 END) as wins,
-                AVG(kills) as avg_kills,
-                AVG(deaths) as avg_deaths,
-                AVG(assists) as avg_assists
-            FROM game_history
-            WHERE your_hero = ?
-        """, (hero,))
-    else:
-        cur.execute("""
-            SELECT 
-                COUNT(*) as total_games,
-                SUM(CASE WHEN result = 'Win' THEN 1 ELSE 0 END) as wins,
-                AVG(kills) as avg_kills,
-                AVG(deaths) as avg_deaths,
-                AVG(assists) as avg_assists
-            FROM game_history
-        """)
+    # Day of week performance
+    heatmap_data = _cached_day_performance(db_path, mtime)
+    render_day_performance(heatmap_data)
     
-    row = cur.fetchone()
-    conn.close()
-    
-    if row and row[0] > 0:
-        total, wins = row[0], row[1] or 0
-        return {
-            'total_games': total,
-            'wins': wins,
-            'losses': total - wins,
-            'win_rate': (wins / total * 100) if total > 0 else 0,
-            'avg_kills': row[2] or 0,
-            'avg_deaths': row[3] or 0,
-            'avg_assists': row[4] or 0,
-        }
-    return {
-        'total_games': 0,
-        'wins': 0,
-        'losses': 0,
-        'win_rate': 0,
-        'avg_kills': 0,
-        'avg_deaths': 0,
-        'avg_assists': 0,
-    }
+    # Longer trend
+    st.divider()
+    days_back = st.selectbox("Time period", [7, 14, 30, 60, 90], index=2, key="gh_days_back")
+    trend_data = _cached_win_rate(db_path, mtime, days_back)
+    render_win_rate_trend(trend_data)
 
 def delete_game(db_path: str, game_id: int):
     """Delete a game record"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM game_history WHERE game_id = ?", (game_id,))
-    conn.commit()
-    conn.close()
+    delete_games(db_path, [game_id])
+
+def delete_games(db_path: str, game_ids) -> int:
+    """Delete several game records in one transaction; returns rows deleted"""
+    ids = list(game_ids)
+    if not ids:
+        return 0
+    conn, lock = get_db(db_path)
+    with lock:
+        with conn:
+            conn.execute("BEGIN")
+            deleted = conn.execute(
+                f"DELETE FROM game_history WHERE game_id IN ({','.join('?' * len(ids))})",
+                ids,
+            ).rowcount
+    clear_history_caches()
+    return deleted
+
+def clear_game_history(db_path: str):
+    """Delete every game, its side rows and the roll-ups in one transaction.
+    The side tables are emptied first so the per-row delete triggers on
+    game_history find nothing left to update."""
+    conn, lock = get_db(db_path)
+    with lock:
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM game_heroes")
+            conn.execute("DELETE FROM hero_stats")
+            conn.execute("DELETE FROM matchup_stats")
+            conn.execute("DELETE FROM game_history")
+    clear_history_caches()
+
+def queue_game_delete(game_id: int):
+    """Button callback: deletes are flushed together at the top of the next run"""
+    st.session_state.setdefault("pending_deletes", set()).add(game_id)
 
 def update_game(db_path: str, game_id: int, game_data: dict):
     """Update a game record"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        UPDATE game_history 
-        SET date = ?,
-            your_hero = ?,
-            your_role = ?,
-            teammates = ?,
-            enemies = ?,
-            result = ?,
-            mvp_status = ?,
-            kills = ?,
-            deaths = ?,
-            assists = ?,
-            notes = ?
-        WHERE game_id = ?
-    """, (
-        game_data['date'],
-        game_data['your_hero'],
-        game_data['your_role'],
-        json.dumps(game_data['teammates']),
-        json.dumps(game_data['enemies']),
-        game_data['result'],
-        game_data.get('mvp_status'),
-        game_data.get('kills'),
-        game_data.get('deaths'),
-        game_data.get('assists'),
-        game_data.get('notes', ''),
-        game_id
-    ))
-    
-    conn.commit()
-    conn.close()
+    conn, lock = get_db(db_path)
+    with lock:
+        conn.execute(SQL_UPDATE_GAME, (
+            game_data['date'],
+            game_data['your_hero'],
+            game_data['your_role'],
+            json_dumps(game_data['teammates']),
+            json_dumps(game_data['enemies']),
+            game_data['result'],
+            game_data.get('mvp_status'),
+            game_data.get('kills'),
+            game_data.get('deaths'),
+            game_data.get('assists'),
+            game_data.get('notes', ''),
+            lower_notes(game_data.get('notes', '')),
+            game_id
+        ))
+    clear_history_caches()
 
 def render_edit_game_modal(db_path: str, game_id: int, heroes: list, roles: list):
     """Render modal dialog to edit a game"""
-    # Get current game data
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
+    from datetime import datetime
     
-    cur.execute("SELECT * FROM game_history WHERE game_id = ?", (game_id,))
-    row = cur.fetchone()
-    conn.close()
+    # Get current game data
+    conn, lock = get_db(db_path)
+    with lock:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row  # cursor-level: the connection is shared
+        cur.execute("SELECT * FROM game_history WHERE game_id = ?", (game_id,))
+        row = cur.fetchone()
+        games = _attach_game_heroes(conn.cursor(), [dict(row)] if row else [])
     
-    if not row:
+    if not games:
         st.error("Game not found!")
         del st.session_state.editing_game_id
         return
     
-    game = dict(row)
-    game['teammates'] = json.loads(game['teammates']) if game['teammates'] else []
-    game['enemies'] = json.loads(game['enemies']) if game['enemies'] else []
+    game = games[0]
     
     # Modal overlay
     st.markdown("---")
@@ -367,22 +973,84 @@ meta_path = st.sidebar.text_input("Meta JSON path", value=DEFAULT_META)
 # Ensure game history table exists
 ensure_game_history_table(db_path)
 
-# Load heroes
-heroes = db_hero_list(db_path)
+# Load heroes once per session (and again only if the DB path changes)
+if st.session_state.get('heroes_db_path') != db_path:
+    st.session_state.heroes = db_hero_list(db_path)
+    st.session_state.heroes_set = frozenset(st.session_state.heroes)
+    st.session_state.heroes_db_path = db_path
+heroes = st.session_state.heroes
 if not heroes:
     st.error("No heroes found. Check your mlcounter.db path.")
     st.stop()
+heroes_set = st.session_state.heroes_set
 
 
 # -----------------------------
 # Hero Pool Presets
 # -----------------------------
 DEFAULT_POOLS = {
-    "EXP Lane": ["Argus", "Lapulapu", "Terizla", "Yuzhong", "Martis", "Thamuz"],
-    "Gold Lane": ["Brody", "Claude", "Harith", "Miya", "Wanwan"],
-    "Jungler": ["Martis", "Fredrinn", "Nolan", "Ling"],
-    "Roam": ["Atlas", "Khufra", "Diggie", "Kaja", "Akai", "Tigreal"],
-    "Mid Lane": ["Valir", "Kadita", "Lylia", "Pharsa", "Yve"],
+    "EXP Lane": ("Argus", "Lapulapu", "Terizla", "Yuzhong", "Martis", "Thamuz"),
+    "Gold Lane": ("Brody", "Claude", "Harith", "Miya", "Wanwan"),
+    "Jungler": ("Martis", "Fredrinn", "Nolan", "Ling"),
+    "Roam": ("Atlas", "Khufra", "Diggie", "Kaja", "Akai", "Tigreal"),
+    "Mid Lane": ("Valir", "Kadita", "Lylia", "Pharsa", "Yve"),
+}
+
+@st.cache_resource(show_spinner=False)
+def ensure_hero_pool_table(db_path: str) -> bool:
+    """Load DEFAULT_POOLS into the hero_pool table; runs once per process per DB.
+    The table is replaced wholesale in one transaction, so DEFAULT_POOLS stays
+    authoritative (removed or reordered heroes don't linger)."""
+    conn, lock = get_db(db_path)
+    with lock:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS hero_pool (
+                role TEXT NOT NULL,
+                hero TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (role, hero)
+            ) WITHOUT ROWID
+        """)
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM hero_pool")
+            conn.executemany(
+                "INSERT OR IGNORE INTO hero_pool (role, hero, position) VALUES (?, ?, ?)",
+                [(role, hero, i) for role, pool in DEFAULT_POOLS.items() for i, hero in enumerate(pool)],
+            )
+    return True
+
+@st.cache_data(show_spinner=False)
+def load_preset_pools(db_path: str) -> dict:
+    """{role: heroes} for every lane preset, in preset order, keeping only heroes
+    present in the DB (one join instead of a set intersection per preset)"""
+    ensure_hero_pool_table(db_path)
+    conn, lock = get_db(db_path)
+    with lock:
+        rows = conn.execute("""
+            SELECT p.role, h.hero
+            FROM hero_pool p
+            JOIN heroes h ON h.hero = p.hero
+            ORDER BY p.role, p.position
+        """).fetchall()
+    pools = {}
+    for role, hero in rows:
+        pools.setdefault(role, []).append(hero)
+    return {role: tuple(pool) for role, pool in pools.items()}
+
+
+# Sidebar labels for the editable Weights table (param -> label)
+WEIGHT_LABELS = {
+    "strong_hit": "Strong hit (+)",
+    "weak_hit": "Weak hit (-)",
+    "win": "Win weight",
+    "pick": "Pick weight",
+    "ban": "Ban weight",
+    "tier": "Tier weight",
+    "personal_wr": "Personal WR weight",
+    "matchup_win": "Good matchup bonus",
+    "matchup_loss": "Bad matchup penalty",
+    "min_games_confidence": "Min games for confidence",
 }
 
 
@@ -397,7 +1065,7 @@ if page == "🎯 Draft Analysis":
     render_session_sidebar(db_path)
     
     # NEW: Check if completing session (modal)
-    tracker = SessionTracker(db_path)
+    tracker = get_session_tracker(db_path)
     if st.session_state.get('show_complete_modal') and st.session_state.get('active_session_id'):
         session = tracker.get_session(st.session_state.active_session_id)
         if session:
@@ -408,40 +1076,39 @@ if page == "🎯 Draft Analysis":
     with st.sidebar:
         st.divider()
         st.header("Draft Calibration")
-        base_score = st.number_input("Base score", value=5.0, step=0.5)
-        top_n = st.slider("Top N results", min_value=3, max_value=20, value=10)
-        use_inverse = st.checkbox("Use inverse counter inference (recommended)", value=True)
-
-        st.subheader("Weights")
-        strong_hit = st.number_input("Strong hit (+)", value=1.25, step=0.1)
-        weak_hit = st.number_input("Weak hit (-)", value=-1.25, step=0.1)
-        win_w = st.number_input("Win weight", value=0.18, step=0.01)
-        pick_w = st.number_input("Pick weight", value=0.02, step=0.01)
-        ban_w = st.number_input("Ban weight", value=0.05, step=0.01)
-        tier_w = st.number_input("Tier weight", value=0.75, step=0.05)
-        
-        st.subheader("Personal Performance Weights")
-        personal_wr_w = st.number_input("Personal WR weight", value=0.08, step=0.01,
-                                        help="Weight for your personal win rate deviation from 50%")
-        matchup_win_w = st.number_input("Good matchup bonus", value=1.5, step=0.1,
-                                       help="Bonus when you have 60%+ WR vs enemy")
-        matchup_loss_w = st.number_input("Bad matchup penalty", value=-1.8, step=0.1,
-                                        help="Penalty when you have <40% WR vs enemy")
-        min_games = st.number_input("Min games for confidence", value=5, step=1,
-                                   help="Minimum games for high confidence rating")
-
-    weights = {
-        "strong_hit": float(strong_hit),
-        "weak_hit": float(weak_hit),
-        "win": float(win_w),
-        "pick": float(pick_w),
-        "ban": float(ban_w),
-        "tier": float(tier_w),
-        "personal_wr": float(personal_wr_w),
-        "matchup_win": float(matchup_win_w),
-        "matchup_loss": float(matchup_loss_w),
-        "min_games_confidence": int(min_games),
-    }
+        # Form: tweaking calibration/weights does not rerun the page until applied
+        with st.form("draft_calibration_form", border=False):
+            base_score = st.number_input("Base score", value=5.0, step=0.5)
+            top_n = st.slider("Top N results", min_value=3, max_value=20, value=10)
+            use_inverse = st.checkbox("Use inverse counter inference (recommended)", value=True)
+
+            st.subheader("Weights")
+            # One editable table instead of a number_input per weight
+            default_weights = Weights()
+            edited_weights = st.data_editor(
+                pd.DataFrame({
+                    "param": list(WEIGHT_LABELS),
+                    "weight": list(WEIGHT_LABELS.values()),
+                    "value": [float(getattr(default_weights, k)) for k in WEIGHT_LABELS],
+                }),
+                hide_index=True,
+                key="weights_editor",
+                disabled=["weight"],
+                column_order=("weight", "value"),
+                column_config={
+                    "weight": st.column_config.TextColumn("Weight"),
+                    "value": st.column_config.NumberColumn("Value", step=0.01, required=True),
+                },
+                use_container_width=True,
+            )
+            st.caption("Personal WR weight scales your win rate deviation from 50%; "
+                       "matchup bonus/penalty apply at 60%+ / under 40% WR vs an enemy.")
+            st.form_submit_button("Apply calibration", use_container_width=True)
+
+    weights = Weights(**{
+        k: int(v) if k == "min_games_confidence" else float(v)
+        for k, v in zip(edited_weights["param"], edited_weights["value"])
+    })
 
     # Main UI
     col_left, col_right = st.columns([1, 1], gap="large")
@@ -461,7 +1128,10 @@ if page == "🎯 Draft Analysis":
         
         # Only use preset if user selected a lane
         if role != "Select manually...":
-            preset_pool = pick_default_pool(heroes, available_pools.get(role, []))
+            if available_pools is DEFAULT_POOLS:
+                preset_pool = load_preset_pools(db_path).get(role, ())
+            else:
+                preset_pool = pick_default_pool(heroes_set, available_pools.get(role, []))
             pool = st.multiselect("Active Pool", options=heroes, default=preset_pool)
             
             # Show pool info
@@ -527,29 +1197,30 @@ if page == "🎯 Draft Analysis":
                                help="Adjust recommendations based on your game history")
     
     # Run Analysis
-    if st.button("🚀 Run Draft Analysis", type="primary", use_container_width=True):
-        if not pool:
-            st.warning("Please select at least one hero for your pool.")
-            st.stop()
-
+    run_clicked = st.button("🚀 Run Draft Analysis", type="primary", use_container_width=True)
+    if run_clicked and not pool:
+        st.warning("Please select at least one hero for your pool.")
+    elif run_clicked:
         # Combine teammates and banned into unavailable list
-        avoid = list(set(teammates + banned))
-        final_pool = [h for h in pool if h not in set(avoid)]
+        avoid_set = set(teammates) | set(banned)
+        final_pool = tuple(h for h in pool if h not in avoid_set)
 
-        engine = DraftEngine(db_path=db_path, meta_path=meta_path, weights=weights)
         try:
-            if not engine.meta:
+            if not get_engine(db_path, meta_path)[0].meta:
                 st.warning("meta.json not loaded/found. Meta bonuses will be 0.")
 
-            results = engine.recommend(
+            results = cached_recommend(
+                db_path,
+                db_mtime(db_path),
+                meta_path,
                 pool=final_pool,
-                enemies=enemies,
-                teammates=teammates,
+                enemies=tuple(enemies),
+                teammates=tuple(teammates),
                 base_score=float(base_score),
                 top_n=int(top_n),
                 use_inverse=use_inverse,
                 use_personal=use_personal,
-                use_synergy=False,
+                weights=weights,
             )
             
             # IMPORTANT: Store results in session state so they persist!
@@ -560,8 +1231,6 @@ if page == "🎯 Draft Analysis":
             st.error(f"Engine Error: {e}")
             import traceback
             st.code(traceback.format_exc())
-        finally:
-            engine.close()
     
     # Display results from session state (persists across reruns!)
     if 'draft_results' in st.session_state and st.session_state.draft_results:
@@ -570,79 +1239,115 @@ if page == "🎯 Draft Analysis":
         
         st.subheader("Analysis Results")
         
-        for i, r in enumerate(results, start=1):
-                with st.container(border=True):
-                    c1, c2, c3 = st.columns([3, 1, 1])
-                    with c1:
-                        st.markdown(f"### #{i} {r.hero}")
-                        
-                        # Show matchup warnings prominently
-                        if r.matchup_warnings:
-                            for warning in r.matchup_warnings:
-                                st.warning(warning)
+        matchups = load_matchup_table(db_path)
+        
+        # One dataframe for the whole list; the detailed card is built only
+        # for the row being inspected
+        df = pd.DataFrame([
+            {
+                "#": i,
+                "Hero": r.hero,
+                "Score": r.score,
+                "Counter": r.counter_bonus,
+                "Meta": r.meta_bonus,
+                "Personal": r.personal_bonus,
+                "Strong": ", ".join(r.strong_hits),
+                "Weak": ", ".join(r.weak_hits),
+            }
+            for i, r in enumerate(results, start=1)
+        ])
+        st.dataframe(
+            df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Score": st.column_config.ProgressColumn(
+                    "Score",
+                    format="%.2f",
+                    min_value=min(0.0, float(df["Score"].min())),
+                    max_value=max(1.0, float(df["Score"].max())),
+                ),
+            },
+        )
+        
+        i = st.selectbox(
+            "Inspect result",
+            options=df["#"].tolist(),
+            format_func=lambda n: f"#{n} {results[n - 1].hero}",
+            key="draft_inspect_row",
+        )
+        r = results[i - 1]
+        
+        with st.container(border=True):
+            c1, c2, c3 = st.columns([3, 1, 1])
+            with c1:
+                st.markdown(f"### #{i} {r.hero}")
+                
+                # Show matchup warnings prominently
+                if r.matchup_warnings:
+                    st.warning("\n\n".join(r.matchup_warnings))
+                
+                st.markdown(f"**Reasoning:** {r.explain}")
+                st.info(f"💡 **Pro-Tip:** {r.early_tip}")
+            with c2:
+                st.metric("Engine Score", f"{r.score:.2f}")
+            with c3:
+                if r.personal_stats and r.personal_stats.total_games > 0:
+                    # Show confidence indicator
+                    conf_emoji = {
+                        "high": "⭐⭐⭐",
+                        "medium": "⭐⭐",
+                        "low": "⭐",
+                        "none": ""
+                    }
+                    delta_color = "normal"
+                    if r.personal_stats.win_rate >= 55:
+                        delta_color = "normal"
+                    elif r.personal_stats.win_rate <= 45:
+                        delta_color = "inverse"
+                    
+                    st.metric(
+                        "Your Win Rate", 
+                        f"{r.personal_stats.win_rate:.1f}%",
+                        f"{r.personal_stats.total_games}g {conf_emoji[r.personal_stats.confidence]}",
+                        delta_color=delta_color
+                    )
+                else:
+                    st.caption("No personal history")
+                
+                st.divider()
+                
+                # NEW: Add "I Pick This" button
+                add_pick_hero_button(r.hero, role if role != "Select manually..." else "Unknown", db_path)
+
+            with st.expander("Technical Breakdown"):
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    st.write(f"**Counter bonus:** {r.counter_bonus:+.2f}")
+                    st.write(f"**Meta bonus:** {r.meta_bonus:+.2f}")
+                    st.write(f"**Personal bonus:** {r.personal_bonus:+.2f}")
+                    st.write(f"**Synergy bonus:** {r.synergy_bonus:+.2f} (coming soon)")
+                    st.write(f"**Strong hits:** {', '.join(r.strong_hits) if r.strong_hits else 'None'}")
+                    st.write(f"**Weak hits:** {', '.join(r.weak_hits) if r.weak_hits else 'None'}")
+                with col_b:
+                    if r.personal_stats and r.personal_stats.total_games > 0:
+                        st.write(f"**Personal Record:** {r.personal_stats.wins}W - {r.personal_stats.losses}L")
+                        st.write(f"**Confidence:** {r.personal_stats.confidence.title()}")
                         
-                        st.markdown(f"**Reasoning:** {r.explain}")
-                        st.info(f"💡 **Pro-Tip:** {r.early_tip}")
-                    with c2:
-                        st.metric("Engine Score", f"{r.score:.2f}")
-                    with c3:
-                        if r.personal_stats and r.personal_stats.total_games > 0:
-                            # Show confidence indicator
-                            conf_emoji = {
-                                "high": "⭐⭐⭐",
-                                "medium": "⭐⭐",
-                                "low": "⭐",
-                                "none": ""
-                            }
-                            delta_color = "normal"
-                            if r.personal_stats.win_rate >= 55:
-                                delta_color = "normal"
-                            elif r.personal_stats.win_rate <= 45:
-                                delta_color = "inverse"
-                            
-                            st.metric(
-                                "Your Win Rate", 
-                                f"{r.personal_stats.win_rate:.1f}%",
-                                f"{r.personal_stats.total_games}g {conf_emoji[r.personal_stats.confidence]}",
-                                delta_color=delta_color
+                        # Show matchup details (if we have enemies in analysis)
+                        if 'draft_enemies' in st.session_state and st.session_state.draft_enemies:
+                            df_mu = pd.DataFrame(
+                                [(enemy, *matchups.get((r.hero, enemy), (0, 0)))
+                                 for enemy in st.session_state.draft_enemies],
+                                columns=["Enemy", "W", "L"],
                             )
-                        else:
-                            st.caption("No personal history")
-                        
-                        st.divider()
-                        
-                        # NEW: Add "I Pick This" button
-                        add_pick_hero_button(r.hero, role if role != "Select manually..." else "Unknown", db_path)
-
-                    with st.expander("Technical Breakdown"):
-                        col_a, col_b = st.columns(2)
-                        with col_a:
-                            st.write(f"**Counter bonus:** {r.counter_bonus:+.2f}")
-                            st.write(f"**Meta bonus:** {r.meta_bonus:+.2f}")
-                            st.write(f"**Personal bonus:** {r.personal_bonus:+.2f}")
-                            st.write(f"**Synergy bonus:** {r.synergy_bonus:+.2f} (coming soon)")
-                            st.write(f"**Strong hits:** {', '.join(r.strong_hits) if r.strong_hits else 'None'}")
-                            st.write(f"**Weak hits:** {', '.join(r.weak_hits) if r.weak_hits else 'None'}")
-                        with col_b:
-                            if r.personal_stats and r.personal_stats.total_games > 0:
-                                st.write(f"**Personal Record:** {r.personal_stats.wins}W - {r.personal_stats.losses}L")
-                                st.write(f"**Confidence:** {r.personal_stats.confidence.title()}")
-                                
-                                # Show matchup details (if we have enemies in analysis)
-                                if 'draft_enemies' in st.session_state and st.session_state.draft_enemies:
-                                    st.write("**Matchup History:**")
-                                    # Create temp engine to get matchup stats
-                                    temp_engine = DraftEngine(db_path=db_path, meta_path=meta_path, weights=weights)
-                                    try:
-                                        for enemy in st.session_state.draft_enemies:
-                                            matchup = temp_engine._get_matchup_stats(r.hero, enemy)
-                                            if matchup and matchup.total > 0:
-                                                emoji = "✅" if matchup.win_rate >= 50 else "❌"
-                                                st.caption(f"{emoji} vs {enemy}: {matchup.wins}-{matchup.losses}")
-                                    finally:
-                                        temp_engine.close()
-                            else:
-                                st.caption("Play some games to build matchup history!")
+                            df_mu = df_mu[df_mu["W"] + df_mu["L"] > 0]
+                            if not df_mu.empty:
+                                st.write("**Matchup History:**")
+                                df_mu.insert(0, "", ["✅" if w >= l else "❌" for w, l in zip(df_mu["W"], df_mu["L"])])
+                                st.table(df_mu.set_index("Enemy"))
+                    else:
+                        st.caption("Play some games to build matchup history!")
         
         # Add clear results button at the end
         st.divider()
@@ -656,6 +1361,8 @@ if page == "🎯 Draft Analysis":
 # PAGE: LOG GAME
 # =============================
 elif page == "📝 Log Game":
+    from datetime import datetime
+    
     st.title("📝 Log Game")
     st.caption("Record your match results to build performance history")
     
@@ -675,8 +1382,23 @@ elif page == "📝 Log Game":
             assists = st.number_input("Assists", min_value=0, value=0, step=1)
         
         st.subheader("Team Composition")
-        teammates = st.multiselect("Teammates (4 heroes)", options=heroes, max_selections=4)
-        enemies = st.multiselect("Enemy Team (5 heroes)", options=heroes, max_selections=5)
+        # Fixed-size slots: one selectbox per hero instead of a multiselect
+        # whose whole selection is re-validated on every change
+        slot_options = ("", *heroes)
+        st.caption("Teammates (4 heroes)")
+        teammate_cols = st.columns(4)
+        teammates = [
+            teammate_cols[i].selectbox(f"Teammate {i + 1}", slot_options, key=f"log_teammate_{i}")
+            for i in range(4)
+        ]
+        st.caption("Enemy Team (5 heroes)")
+        enemy_cols = st.columns(5)
+        enemies = [
+            enemy_cols[i].selectbox(f"Enemy {i + 1}", slot_options, key=f"log_enemy_{i}")
+            for i in range(5)
+        ]
+        teammates = list(dict.fromkeys(h for h in teammates if h))
+        enemies = list(dict.fromkeys(h for h in enemies if h))
         
         notes = st.text_area("Notes (optional)", placeholder="Any observations about the game...")
         
@@ -714,10 +1436,32 @@ elif page == "📝 Log Game":
 elif page == "📊 Game History":
     st.title("📊 Game History")
     
-    # Overall stats
-    overall_stats = get_hero_stats(db_path)
+    # Phase 2: Visual enhancements (imported only on this page)
+    try:
+        from visualizations import (
+            render_win_rate_trend,
+            render_role_distribution,
+            render_enemy_matchup_chart,
+        )
+        VISUALIZATIONS_AVAILABLE = True
+    except ImportError:
+        VISUALIZATIONS_AVAILABLE = False
+    
+    # Flush deletes queued by the Recent Games buttons before anything reads
+    # the table, so the page renders without them and no extra rerun is needed
+    pending_deletes = st.session_state.get("pending_deletes")
+    if pending_deletes:
+        deleted = delete_games(db_path, pending_deletes)
+        pending_deletes.clear()
+        st.toast(f"🗑️ Deleted {deleted} game{'s' if deleted != 1 else ''}")
     
-    if overall_stats['total_games'] > 0:
+    mtime = db_mtime(db_path)
+    
+    # A fresh DB stops at the count: no stats, charts or history queries
+    if _count_games(db_path, mtime) > 0:
+        # Overall stats
+        overall_stats = _cached_hero_stats(db_path, mtime)
+        
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -727,8 +1471,7 @@ elif page == "📊 Game History":
         with col3:
             st.metric("Record", f"{overall_stats['wins']}W - {overall_stats['losses']}L")
         with col4:
-            kda = (overall_stats['avg_kills'] + overall_stats['avg_assists']) / max(overall_stats['avg_deaths'], 1)
-            st.metric("Avg KDA", f"{kda:.2f}")
+            st.metric("Avg KDA", f"{overall_stats['kda']:.2f}")
         
         st.divider()
         
@@ -746,56 +1489,27 @@ elif page == "📊 Game History":
                 
                 with col_a:
                     # Win rate trend
-                    chart_data = create_win_rate_chart_data(db_path, days=30)
+                    chart_data = _cached_win_rate(db_path, mtime, 30)
                     render_win_rate_trend(chart_data)
                 
                 with col_b:
                     # Role distribution
-                    role_data = create_role_distribution_data(db_path)
+                    role_data = _cached_role_distribution(db_path, mtime)
                     render_role_distribution(role_data)
             
             with tab2:
                 st.subheader("Hero Performance Comparison")
-                
-                min_games = st.slider("Minimum games to show", 1, 10, 3)
-                heroes_data = create_hero_performance_data(db_path, min_games=min_games)
-                
-                render_hero_comparison_chart(heroes_data)
-                
-                # Detailed hero stats table
-                with st.expander("📋 Detailed Hero Statistics"):
-                    for hero_data in heroes_data:
-                        with st.container(border=True):
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.write(f"**{hero_data['hero']}**")
-                                st.caption(f"{hero_data['total_games']} games")
-                            with col2:
-                                wr_color = "🟢" if hero_data['win_rate'] >= 50 else "🔴"
-                                st.write(f"{wr_color} {hero_data['win_rate']:.1f}% WR")
-                                st.caption(f"{hero_data['wins']}W - {hero_data['losses']}L")
-                            with col3:
-                                st.write(f"KDA: {hero_data['kda']:.2f}")
-                                st.caption(f"{hero_data['avg_kills']:.1f}/{hero_data['avg_deaths']:.1f}/{hero_data['avg_assists']:.1f}")
+                render_hero_performance_tab(db_path, mtime)
             
             with tab3:
                 st.subheader("Enemy Matchup Analysis")
                 
-                enemy_data = create_enemy_encounter_data(db_path, top_n=10)
+                enemy_data = _cached_enemy_encounters(db_path, mtime, 10)
                 render_enemy_matchup_chart(enemy_data)
             
             with tab4:
                 st.subheader("Performance Trends")
-                
-                # Day of week performance
-                heatmap_data = create_performance_heatmap_data(db_path)
-                render_day_performance(heatmap_data)
-                
-                # Longer trend
-                st.divider()
-                days_back = st.selectbox("Time period", [7, 14, 30, 60, 90], index=2)
-                trend_data = create_win_rate_chart_data(db_path, days=days_back)
-                render_win_rate_trend(trend_data)
+                render_trends_tab(db_path, mtime)
         
         else:
             st.warning("⚠️ Install visualizations.py for enhanced charts")
@@ -806,26 +1520,18 @@ elif page == "📊 Game History":
         st.subheader("Hero Statistics")
         
         # Get all heroes you've played
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT your_hero, COUNT(*) as games
-            FROM game_history
-            GROUP BY your_hero
-            ORDER BY games DESC
-        """)
-        hero_game_counts = cur.fetchall()
-        conn.close()
+        counts_map = _cached_hero_counts(db_path, mtime)
         
-        if hero_game_counts:
+        if counts_map:
             selected_hero = st.selectbox(
                 "View stats for hero:",
-                options=["All Heroes"] + [h[0] for h in hero_game_counts],
-                format_func=lambda x: f"{x} ({dict(hero_game_counts).get(x, 0)} games)" if x != "All Heroes" else x
+                options=["All Heroes", *counts_map],
+                format_func=lambda x: x if x == "All Heroes" else f"{x} ({counts_map[x]} games)",
+                key="gh_hero_stats"
             )
             
             if selected_hero != "All Heroes":
-                hero_stats = get_hero_stats(db_path, selected_hero)
+                hero_stats = _cached_hero_stats(db_path, mtime, selected_hero)
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -833,8 +1539,7 @@ elif page == "📊 Game History":
                 with col2:
                     st.metric("Win Rate", f"{hero_stats['win_rate']:.1f}%")
                 with col3:
-                    kda_val = (hero_stats['avg_kills'] + hero_stats['avg_assists']) / max(hero_stats['avg_deaths'], 1)
-                    st.metric("Avg KDA", f"{kda_val:.2f}")
+                    st.metric("Avg KDA", f"{hero_stats['kda']:.2f}")
                 
                 st.caption(f"Avg: {hero_stats['avg_kills']:.1f} / {hero_stats['avg_deaths']:.1f} / {hero_stats['avg_assists']:.1f}")
         
@@ -842,15 +1547,20 @@ elif page == "📊 Game History":
         
         # Recent games
         st.subheader("Recent Games")
-        limit = st.slider("Show last N games", min_value=5, max_value=100, value=20, step=5)
         
-        games = get_game_history(db_path, limit=limit)
+        # Pages of GH_PAGE_SIZE are fetched (and cached) separately, so
+        # "Load more" only queries the new page and the widget tree grows
+        # in small steps instead of starting at 100 expanders
+        GH_PAGE_SIZE = 20
+        shown_pages = st.session_state.setdefault("gh_pages", 1)
+        shown = 0
         
-        for game in games:
-            result_color = "🟢" if game['result'] == "Win" else "🔴"
-            kda_str = f"{game['kills']}/{game['deaths']}/{game['assists']}" if game['kills'] is not None else "N/A"
+        for game in iter_game_history(db_path, mtime, shown_pages, GH_PAGE_SIZE):
+            shown += 1
+            game_id = game['game_id']
+            kda_str = game['kda_str']
             
-            with st.expander(f"{result_color} {game['date']} - {game['your_hero']} ({game['result']}) - KDA: {kda_str}"):
+            with st.expander(f"{game['result_icon']} {game['date']} - {game['your_hero']} ({game['result']}) - KDA: {kda_str}"):
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -872,16 +1582,22 @@ elif page == "📊 Game History":
                 
                 with col_a:
                     # Edit button
-                    if st.button(f"✏️ Edit Game", key=f"edit_{game['game_id']}", use_container_width=True):
-                        st.session_state.editing_game_id = game['game_id']
+                    if st.button("✏️ Edit Game", key=f"edit_{game_id}", use_container_width=True):
+                        st.session_state.editing_game_id = game_id
                         st.rerun()
                 
                 with col_b:
                     # Delete button
-                    if st.button(f"🗑️ Delete", key=f"del_{game['game_id']}", use_container_width=True):
-                        delete_game(db_path, game['game_id'])
-                        st.success("Game deleted!")
-                        st.rerun()
+                    st.button(
+                        "🗑️ Delete", key=f"del_{game_id}", use_container_width=True,
+                        on_click=queue_game_delete, args=(game_id,)
+                    )
+        
+        if shown < overall_stats['total_games']:
+            st.caption(f"Showing {shown} of {overall_stats['total_games']} games")
+            if st.button("Load more", key="gh_load_more", use_container_width=True):
+                st.session_state.gh_pages += 1
+                st.rerun()
         
         # Edit modal (appears when user clicks edit)
         if 'editing_game_id' in st.session_state and st.session_state.editing_game_id:
@@ -897,279 +1613,268 @@ elif page == "🧠 Notes Insights":
     st.title("🧠 Notes Insights")
     st.caption("AI-powered analysis of your game notes to extract patterns and learnings")
     
-    # Import the analyzers
-    try:
-        from notes_analyzer_free import FreeNotesAnalyzer
-        analyzer = FreeNotesAnalyzer(db_path)
+    if not NOTES_ANALYZER_AVAILABLE:
+        st.error("Notes analyzer module not found. Make sure notes_analyzer_free.py is in the same directory.")
+        st.stop()
+    
+    analyzer = get_notes_analyzer(db_path)
+    
+    # Notes, win count and hero index come from one cached fetch; the header
+    # metrics and the hero filter are lookups into it
+    bundle = load_notes_bundle(db_path, db_mtime(db_path))
+    
+    if not bundle.notes:
+        st.info("📭 No game notes found. Add notes to your logged games to see insights!")
+        st.markdown("""
+        **How to get started:**
+        1. Go to "Log Game" page
+        2. Fill in game details
+        3. **Add detailed notes** about what happened
+        4. Come back here to see patterns!
         
-        # Try to import Gemini analyzer
-        try:
-            from gemini_analyzer import GeminiNotesAnalyzer, get_gemini_api_key_instructions, GEMINI_AVAILABLE
-            gemini_enabled = GEMINI_AVAILABLE
-        except ImportError:
-            gemini_enabled = False
-        
-        notes = analyzer.get_all_notes()
-        
-        if not notes:
-            st.info("📭 No game notes found. Add notes to your logged games to see insights!")
-            st.markdown("""
-            **How to get started:**
-            1. Go to "Log Game" page
-            2. Fill in game details
-            3. **Add detailed notes** about what happened
-            4. Come back here to see patterns!
-            
-            **Good note examples:**
-            - "Traded too early without level 2 advantage"
-            - "Forgot about Kalea's ult pull range"
-            - "Good synergy with Khufra's setup"
-            - "Should have built defense earlier against their burst"
-            """)
-        else:
-            # Summary stats
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Games with Notes", len(notes))
-            with col2:
-                wins = sum(1 for n in notes if n['result'] == 'Win')
-                st.metric("Win Rate", f"{wins/len(notes)*100:.1f}%")
-            with col3:
-                heroes = len(set(n['your_hero'] for n in notes))
-                st.metric("Heroes Noted", heroes)
-            
-            st.divider()
-            
-            # Filter options
-            col_a, col_b = st.columns(2)
-            with col_a:
-                hero_filter = st.selectbox(
-                    "Filter by hero:",
-                    ["All Heroes"] + sorted(list(set(n['your_hero'] for n in notes)))
-                )
-            with col_b:
-                analysis_options = ["Smart Pattern Analysis", "Simple Stats Only"]
-                if gemini_enabled:
-                    analysis_options.insert(0, "🤖 AI Analysis (Gemini - FREE!)")
-                
-                analysis_type = st.selectbox(
-                    "Analysis type:",
-                    analysis_options
-                )
-            
-            # Filter notes
-            filtered_notes = notes if hero_filter == "All Heroes" else [
-                n for n in notes if n['your_hero'] == hero_filter
-            ]
+        **Good note examples:**
+        - "Traded too early without level 2 advantage"
+        - "Forgot about Kalea's ult pull range"
+        - "Good synergy with Khufra's setup"
+        - "Should have built defense earlier against their burst"
+        """)
+    else:
+        # Summary stats
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Games with Notes", len(bundle.notes))
+        with col2:
+            st.metric("Win Rate", f"{bundle.total_wins/len(bundle.notes)*100:.1f}%")
+        with col3:
+            st.metric("Heroes Noted", len(bundle.hero_index))
+        
+        st.divider()
+        
+        # Filter options
+        col_a, col_b = st.columns(2)
+        with col_a:
+            hero_filter = st.selectbox(
+                "Filter by hero:",
+                ["All Heroes"] + sorted(bundle.hero_index),
+                key="ni_hero_filter"
+            )
+        with col_b:
+            analysis_options = ["Smart Pattern Analysis", "Simple Stats Only"]
+            if gemini_enabled():
+                analysis_options.insert(0, "🤖 AI Analysis (Gemini - FREE!)")
             
-            if st.button("🔍 Analyze Notes", type="primary", use_container_width=True):
-                with st.spinner("Analyzing your notes..."):
-                    if analysis_type == "🤖 AI Analysis (Gemini - FREE!)":
-                        # Gemini AI Analysis
-                        api_key = os.getenv('GEMINI_API_KEY')
+            analysis_type = st.selectbox(
+                "Analysis type:",
+                analysis_options,
+                key="ni_analysis_type"
+            )
+        
+        # Filter notes (hero index lookup, O(notes for that hero))
+        filtered_notes = bundle.for_hero(None if hero_filter == "All Heroes" else hero_filter)
+        
+        if st.button("🔍 Analyze Notes", type="primary", use_container_width=True, key="ni_analyze"):
+            with st.spinner("Analyzing your notes..."):
+                if analysis_type == "🤖 AI Analysis (Gemini - FREE!)":
+                    # Gemini AI Analysis
+                    api_key = os.getenv('GEMINI_API_KEY')
+                    
+                    if not api_key:
+                        from gemini_analyzer import get_gemini_api_key_instructions
+                        st.error("⚠️ Gemini API Key not found!")
+                        st.info(get_gemini_api_key_instructions())
                         
-                        if not api_key:
-                            st.error("⚠️ Gemini API Key not found!")
-                            st.info(get_gemini_api_key_instructions())
+                        # Offer to enter key temporarily
+                        with st.expander("Enter API Key Temporarily"):
+                            temp_key = st.text_input("Gemini API Key", type="password", key="ni_gemini_key")
+                            if temp_key and st.button("Analyze with this key", key="ni_gemini_key_submit"):
+                                api_key = temp_key
+                    
+                    if api_key:
+                        try:
+                            gemini = get_gemini_analyzer(api_key, db_path)
+                            result = gemini.analyze_notes(filtered_notes, focus="all")
                             
-                            # Offer to enter key temporarily
-                            with st.expander("Enter API Key Temporarily"):
-                                temp_key = st.text_input("Gemini API Key", type="password")
-                                if temp_key and st.button("Analyze with this key"):
-                                    api_key = temp_key
-                        
-                        if api_key:
-                            try:
-                                gemini = GeminiNotesAnalyzer(api_key)
-                                result = gemini.analyze_notes(filtered_notes, focus="all")
+                            if result.get('success'):
+                                st.success(f"✅ AI Analysis Complete! ({result['model']}) - {result['cost']}")
+                                if result.get('notes_truncated'):
+                                    st.caption(
+                                        f"Analyzed the newest {result['total_notes_analyzed']} of "
+                                        f"{result['total_notes_provided']} notes "
+                                        f"(capped at {gemini.MAX_NOTES_PER_HERO} per hero)."
+                                    )
+                                
+                                insights = result['insights']
+                                
+                                # Top Recommendations
+                                if insights.get('top_recommendations'):
+                                    st.subheader("🎯 AI-Generated Recommendations")
+                                    for rec in insights['top_recommendations']:
+                                        priority_icons = {
+                                            'HIGH': '🔴',
+                                            'MEDIUM': '🟡',
+                                            'LOW': '🟢'
+                                        }
+                                        icon = priority_icons.get(rec.get('priority', 'MEDIUM'), '🔵')
+                                        
+                                        with st.container(border=True):
+                                            st.markdown(f"### {icon} {rec.get('type', 'Recommendation')}")
+                                            st.write(f"**Hero:** {rec.get('hero', 'N/A')}")
+                                            st.write(f"**Recommendation:** {rec.get('recommendation', 'N/A')}")
+                                            if rec.get('impact'):
+                                                st.caption(f"💡 Impact: {rec['impact']}")
+                                
+                                # Mistakes
+                                if insights.get('mistakes'):
+                                    st.divider()
+                                    st.subheader("❌ AI-Detected Mistakes")
+                                    for mistake in insights['mistakes']:
+                                        with st.expander(f"{mistake.get('hero', 'Unknown')}: {mistake.get('pattern', 'Pattern')[:60]}..."):
+                                            st.write(f"**Pattern:** {mistake.get('pattern', 'N/A')}")
+                                            st.write(f"**Frequency:** {mistake.get('frequency', 0)} times")
+                                            st.write(f"**Severity:** {mistake.get('severity', 'medium').upper()}")
+                                            st.write(f"**Fix:** {mistake.get('recommendation', 'N/A')}")
+                                            if mistake.get('evidence'):
+                                                st.write("**Evidence:**")
+                                                st.caption("\n\n".join(f"> {ev}" for ev in mistake['evidence'][:2]))
                                 
-                                if result.get('success'):
-                                    st.success(f"✅ AI Analysis Complete! ({result['model']}) - {result['cost']}")
-                                    
-                                    insights = result['insights']
-                                    
-                                    # Top Recommendations
-                                    if insights.get('top_recommendations'):
-                                        st.subheader("🎯 AI-Generated Recommendations")
-                                        for rec in insights['top_recommendations']:
-                                            priority_icons = {
-                                                'HIGH': '🔴',
-                                                'MEDIUM': '🟡',
-                                                'LOW': '🟢'
-                                            }
-                                            icon = priority_icons.get(rec.get('priority', 'MEDIUM'), '🔵')
-                                            
-                                            with st.container(border=True):
-                                                st.markdown(f"### {icon} {rec.get('type', 'Recommendation')}")
-                                                st.write(f"**Hero:** {rec.get('hero', 'N/A')}")
-                                                st.write(f"**Recommendation:** {rec.get('recommendation', 'N/A')}")
-                                                if rec.get('impact'):
-                                                    st.caption(f"💡 Impact: {rec['impact']}")
-                                    
-                                    # Mistakes
-                                    if insights.get('mistakes'):
-                                        st.divider()
-                                        st.subheader("❌ AI-Detected Mistakes")
-                                        for mistake in insights['mistakes']:
-                                            with st.expander(f"{mistake.get('hero', 'Unknown')}: {mistake.get('pattern', 'Pattern')[:60]}..."):
-                                                st.write(f"**Pattern:** {mistake.get('pattern', 'N/A')}")
-                                                st.write(f"**Frequency:** {mistake.get('frequency', 0)} times")
-                                                st.write(f"**Severity:** {mistake.get('severity', 'medium').upper()}")
-                                                st.write(f"**Fix:** {mistake.get('recommendation', 'N/A')}")
-                                                if mistake.get('evidence'):
-                                                    st.write("**Evidence:**")
-                                                    for ev in mistake['evidence'][:2]:
-                                                        st.caption(f"> {ev}")
-                                    
-                                    # Learnings
-                                    if insights.get('learnings'):
-                                        st.divider()
-                                        st.subheader("💡 AI-Extracted Learnings")
-                                        for learning in insights['learnings']:
-                                            with st.expander(f"{learning.get('hero', 'Unknown')}: {learning.get('insight', 'Learning')[:60]}..."):
-                                                st.write(f"**Insight:** {learning.get('insight', 'N/A')}")
-                                                st.write(f"**Context:** {learning.get('context', 'N/A')}")
-                                                st.write(f"**Application:** {learning.get('application', 'N/A')}")
-                                    
-                                    # Matchups
-                                    if insights.get('matchups'):
-                                        st.divider()
-                                        st.subheader("⚔️ AI Matchup Analysis")
-                                        for matchup in insights['matchups']:
-                                            icon = "❌" if "struggling" in matchup.get('pattern', '').lower() else "✅"
-                                            with st.expander(f"{icon} {matchup.get('hero', 'Unknown')} vs {matchup.get('enemy', 'Unknown')}"):
-                                                st.write(f"**Pattern:** {matchup.get('pattern', 'N/A')}")
-                                                st.write(f"**Win Rate (from notes):** {matchup.get('win_rate_noted', 'Unknown')}")
-                                                st.write(f"**Tip:** {matchup.get('tip', 'N/A')}")
+                                # Learnings
+                                if insights.get('learnings'):
+                                    st.divider()
+                                    st.subheader("💡 AI-Extracted Learnings")
+                                    for learning in insights['learnings']:
+                                        with st.expander(f"{learning.get('hero', 'Unknown')}: {learning.get('insight', 'Learning')[:60]}..."):
+                                            st.write(f"**Insight:** {learning.get('insight', 'N/A')}")
+                                            st.write(f"**Context:** {learning.get('context', 'N/A')}")
+                                            st.write(f"**Application:** {learning.get('application', 'N/A')}")
                                 
-                                else:
-                                    st.error(f"❌ AI Analysis Failed: {result.get('error', 'Unknown error')}")
-                                    st.warning("Falling back to pattern-based analysis...")
+                                # Matchups
+                                if insights.get('matchups'):
+                                    st.divider()
+                                    st.subheader("⚔️ AI Matchup Analysis")
+                                    for matchup in insights['matchups']:
+                                        icon = "❌" if "struggling" in matchup.get('pattern', '').lower() else "✅"
+                                        with st.expander(f"{icon} {matchup.get('hero', 'Unknown')} vs {matchup.get('enemy', 'Unknown')}"):
+                                            st.write(f"**Pattern:** {matchup.get('pattern', 'N/A')}")
+                                            st.write(f"**Win Rate (from notes):** {matchup.get('win_rate_noted', 'Unknown')}")
+                                            st.write(f"**Tip:** {matchup.get('tip', 'N/A')}")
                             
-                            except Exception as e:
-                                st.error(f"Error: {e}")
-                                st.info("💡 Try the 'Smart Pattern Analysis' option instead (works offline)")
-                    
-                    elif analysis_type == "Smart Pattern Analysis":
-                        # Free local AI-like analysis
-                        hero_param = None if hero_filter == "All Heroes" else hero_filter
-                        analysis = analyzer.generate_full_analysis(hero=hero_param)
+                            else:
+                                st.error(f"❌ AI Analysis Failed: {result.get('error', 'Unknown error')}")
+                                st.warning("Falling back to pattern-based analysis...")
                         
-                        if 'error' in analysis:
-                            st.error(analysis['error'])
-                        else:
-                            st.success(f"✅ Found {analysis['summary']['insights_found']} insights from {analysis['summary']['total_notes']} notes!")
-                            
-                            # Top Recommendations
-                            if analysis['top_recommendations']:
-                                st.subheader("🎯 Top Recommendations")
-                                for rec in analysis['top_recommendations']:
-                                    priority_color = {
-                                        'HIGH': '🔴',
-                                        'MEDIUM': '🟡',
-                                        'LOW': '🟢'
-                                    }
-                                    
-                                    with st.container(border=True):
-                                        st.markdown(f"### {priority_color[rec['priority']]} {rec['type']}")
-                                        st.write(f"**Hero:** {rec['hero']}")
-                                        st.write(f"**Recommendation:** {rec['recommendation']}")
-                                        st.caption(f"Impact: {rec['impact']}")
-                            
-                            # Mistakes Section
-                            if analysis['mistakes']:
-                                st.divider()
-                                st.subheader("❌ Repeated Mistakes")
-                                for mistake in analysis['mistakes']:
-                                    with st.expander(f"{mistake['hero']}: {mistake['insight'][:50]}..."):
-                                        st.write(f"**Insight:** {mistake['insight']}")
-                                        st.write(f"**Frequency:** {mistake['frequency']} games")
-                                        st.write(f"**Confidence:** {int(mistake['confidence']*100)}%")
-                                        if mistake['evidence']:
-                                            st.write("**Evidence from your notes:**")
-                                            for ev in mistake['evidence'][:2]:
-                                                st.caption(f"> {ev}")
-                            
-                            # Matchup Section
-                            if analysis['matchups']:
-                                st.divider()
-                                st.subheader("⚔️ Matchup Insights")
-                                for matchup in analysis['matchups']:
-                                    icon = "❌" if "Struggles" in matchup['insight'] else "✅"
-                                    with st.expander(f"{icon} {matchup['hero']}: {matchup['insight'][:50]}..."):
-                                        st.write(f"**Insight:** {matchup['insight']}")
-                                        st.write(f"**Games noted:** {matchup['frequency']}")
-                                        st.write(f"**Confidence:** {int(matchup['confidence']*100)}%")
-                            
-                            # Learnings Section
-                            if analysis['learnings']:
-                                st.divider()
-                                st.subheader("💡 Key Learnings")
-                                for learning in analysis['learnings']:
-                                    with st.expander(f"{learning['hero']}: {learning['insight'][:50]}..."):
-                                        st.write(f"**Insight:** {learning['insight']}")
-                                        st.write(f"**Noted:** {learning['frequency']} times")
-                                        if learning['evidence']:
-                                            st.write("**Evidence:**")
-                                            for ev in learning['evidence'][:2]:
-                                                st.caption(f"> {ev}")
+                        except Exception as e:
+                            st.error(f"Error: {e}")
+                            st.info("💡 Try the 'Smart Pattern Analysis' option instead (works offline)")
+                
+                elif analysis_type == "Smart Pattern Analysis":
+                    # Free local AI-like analysis
+                    hero_param = None if hero_filter == "All Heroes" else hero_filter
+                    analysis = analyzer.generate_full_analysis(hero=hero_param)
                     
+                    if 'error' in analysis:
+                        st.error(analysis['error'])
                     else:
-                        # Simple stats only
-                        # Build simple stats
-                        hero_stats = defaultdict(lambda: {"wins": 0, "losses": 0, "total": 0})
-                        enemy_counts = Counter()
+                        st.success(f"✅ Found {analysis['summary']['insights_found']} insights from {analysis['summary']['total_notes']} notes!")
                         
-                        for note in filtered_notes:
-                            hero = note['your_hero']
-                            hero_stats[hero]['total'] += 1
-                            if note['result'] == 'Win':
-                                hero_stats[hero]['wins'] += 1
-                            else:
-                                hero_stats[hero]['losses'] += 1
-                            
-                            for enemy in note['enemies']:
-                                enemy_counts[enemy] += 1
+                        # Top Recommendations
+                        if analysis['top_recommendations']:
+                            st.subheader("🎯 Top Recommendations")
+                            for rec in analysis['top_recommendations']:
+                                priority_color = {
+                                    'HIGH': '🔴',
+                                    'MEDIUM': '🟡',
+                                    'LOW': '🟢'
+                                }
+                                
+                                with st.container(border=True):
+                                    st.markdown(f"### {priority_color[rec['priority']]} {rec['type']}")
+                                    st.write(f"**Hero:** {rec['hero']}")
+                                    st.write(f"**Recommendation:** {rec['recommendation']}")
+                                    st.caption(f"Impact: {rec['impact']}")
                         
-                        st.subheader("📊 Simple Statistics")
+                        # Mistakes Section
+                        if analysis['mistakes']:
+                            st.divider()
+                            st.subheader("❌ Repeated Mistakes")
+                            for mistake in analysis['mistakes']:
+                                with st.expander(f"{mistake['hero']}: {mistake['insight'][:50]}..."):
+                                    st.write(f"**Insight:** {mistake['insight']}")
+                                    st.write(f"**Frequency:** {mistake['frequency']} games")
+                                    st.write(f"**Confidence:** {int(mistake['confidence']*100)}%")
+                                    if mistake['evidence']:
+                                        st.write("**Evidence from your notes:**")
+                                        st.caption("\n\n".join(f"> {ev}" for ev in mistake['evidence'][:2]))
                         
-                        # Hero breakdown
-                        st.markdown("### Heroes with Notes")
-                        for hero, stats in sorted(hero_stats.items(), 
-                                                 key=lambda x: x[1]["total"], reverse=True):
-                            wr = (stats["wins"] / stats["total"] * 100) if stats["total"] > 0 else 0
-                            with st.container(border=True):
-                                col1, col2, col3 = st.columns([2, 1, 1])
-                                with col1:
-                                    st.write(f"**{hero}**")
-                                with col2:
-                                    st.write(f"{stats['total']} games")
-                                with col3:
-                                    color = "🟢" if wr >= 50 else "🔴"
-                                    st.write(f"{color} {wr:.1f}% WR")
+                        # Matchup Section
+                        if analysis['matchups']:
+                            st.divider()
+                            st.subheader("⚔️ Matchup Insights")
+                            for matchup in analysis['matchups']:
+                                icon = "❌" if "Struggles" in matchup['insight'] else "✅"
+                                with st.expander(f"{icon} {matchup['hero']}: {matchup['insight'][:50]}..."):
+                                    st.write(f"**Insight:** {matchup['insight']}")
+                                    st.write(f"**Games noted:** {matchup['frequency']}")
+                                    st.write(f"**Confidence:** {int(matchup['confidence']*100)}%")
                         
-                        # Enemy patterns
-                        st.markdown("### Most Faced Enemies")
-                        for enemy, count in enemy_counts.most_common(10):
-                            st.write(f"- **{enemy}**: Mentioned in {count} games")
-            
-            st.divider()
-            
-            # Recent notes view
-            st.subheader("📝 Recent Notes")
-            display_count = st.slider("Show last N notes", 5, 50, 10)
-            
-            for note in filtered_notes[:display_count]:
-                enemies_str = ", ".join(note['enemies'][:3]) if note['enemies'] else "Unknown"
-                result_icon = "🟢" if note['result'] == "Win" else "🔴"
+                        # Learnings Section
+                        if analysis['learnings']:
+                            st.divider()
+                            st.subheader("💡 Key Learnings")
+                            for learning in analysis['learnings']:
+                                with st.expander(f"{learning['hero']}: {learning['insight'][:50]}..."):
+                                    st.write(f"**Insight:** {learning['insight']}")
+                                    st.write(f"**Noted:** {learning['frequency']} times")
+                                    if learning['evidence']:
+                                        st.write("**Evidence:**")
+                                        st.caption("\n\n".join(f"> {ev}" for ev in learning['evidence'][:2]))
                 
-                with st.expander(f"{result_icon} {note['date']} - {note['your_hero']} vs {enemies_str}"):
-                    st.write(f"**Result:** {note['result']}")
-                    st.write(f"**Enemies:** {', '.join(note['enemies'])}")
-                    st.markdown(f"**Notes:**\n> {note['notes']}")
-    
-    except ImportError:
-        st.error("Notes analyzer module not found. Make sure notes_analyzer_free.py is in the same directory.")
+                else:
+                    # Simple stats only
+                    # Build simple stats in one groupby / value_counts pass
+                    df_notes = pd.DataFrame(filtered_notes, columns=['your_hero', 'result', 'enemies'])
+                    df_notes['is_win'] = df_notes['result'].eq('Win')
+                    hero_stats = (
+                        df_notes.groupby('your_hero', sort=False)
+                        .agg(total=('is_win', 'size'), wins=('is_win', 'sum'))
+                        .sort_values('total', ascending=False, kind='stable')
+                    )
+                    hero_stats['wr'] = hero_stats['wins'] / hero_stats['total'] * 100
+                    enemy_counts = df_notes['enemies'].explode().value_counts().head(10)
+                    
+                    st.subheader("📊 Simple Statistics")
+                    
+                    # Hero breakdown
+                    st.markdown("### Heroes with Notes")
+                    for hero, total, wr in zip(hero_stats.index, hero_stats['total'], hero_stats['wr']):
+                        with st.container(border=True):
+                            col1, col2, col3 = st.columns([2, 1, 1])
+                            with col1:
+                                st.write(f"**{hero}**")
+                            with col2:
+                                st.write(f"{total} games")
+                            with col3:
+                                color = "🟢" if wr >= 50 else "🔴"
+                                st.write(f"{color} {wr:.1f}% WR")
+                    
+                    # Enemy patterns
+                    st.markdown("### Most Faced Enemies")
+                    for enemy, count in enemy_counts.items():
+                        st.write(f"- **{enemy}**: Mentioned in {count} games")
+        
+        st.divider()
+        
+        # Recent notes view
+        st.subheader("📝 Recent Notes")
+        display_count = st.slider("Show last N notes", 5, 50, 10, key="ni_display_count")
+        
+        for note in filtered_notes[:display_count]:
+            enemies_str = ", ".join(note['enemies'][:3]) if note['enemies'] else "Unknown"
+            result_icon = "🟢" if note['result'] == "Win" else "🔴"
+            
+            with st.expander(f"{result_icon} {note['date']} - {note['your_hero']} vs {enemies_str}"):
+                st.write(f"**Result:** {note['result']}")
+                st.write(f"**Enemies:** {', '.join(note['enemies'])}")
+                st.markdown(f"**Notes:**\n> {note['notes']}")
 
 
 # =============================
@@ -1186,7 +1891,7 @@ elif page == "⚙️ Settings":
         st.write(f"**Current Database:** `{db_path}`")
         st.write(f"**Meta File:** `{meta_path}`")
         
-        total_games = get_hero_stats(db_path)['total_games']
+        total_games = count_games(db_path)
         st.write(f"**Total Games Logged:** {total_games}")
         
         st.divider()
@@ -1198,11 +1903,7 @@ elif page == "⚙️ Settings":
             confirm = st.checkbox("I understand this will delete all my game history")
             if confirm:
                 if st.button("⚠️ Confirm Delete All", type="secondary"):
-                    conn = sqlite3.connect(db_path)
-                    cur = conn.cursor()
-                    cur.execute("DELETE FROM game_history")
-                    conn.commit()
-                    conn.close()
+                    clear_game_history(db_path)
                     st.success("All game history deleted")
                     st.rerun()
     
@@ -1232,10 +1933,7 @@ elif page == "⚙️ Settings":
                 # Show current heroes as tags
                 current_pool = st.session_state.custom_pools.get(lane, [])
                 if current_pool:
-                    cols = st.columns(4)
-                    for i, hero in enumerate(current_pool):
-                        with cols[i % 4]:
-                            st.caption(f"• {hero}")
+                    st.caption("  ".join(f"• {hero}" for hero in current_pool))
                 else:
                     st.caption("_No heroes in this pool_")
                 
@@ -17,20 +17,41 @@ import re
 import sqlite3
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
 from bs4.element import Tag
 
+from db_connect import CONNECT_PRAGMAS
+
+# Optional: pip install lxml. With it, parse_hero_page() queries the lxml tree
+# directly with XPath (no BeautifulSoup Tag wrappers); without it, pages go
+# through BeautifulSoup on the pure-Python html.parser.
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+    HTML_PARSER = "lxml"
+except ImportError:
+    LXML_AVAILABLE = False
+    HTML_PARSER = "html.parser"
+
 
 # -----------------------------
 # Text normalization utilities
 # -----------------------------
 
 _WS_RE = re.compile(r"\s+")
+_WIN_RATE_RE = re.compile(r"win rate:\s*([0-9]+(?:\.[0-9]+)?)\s*%", re.I)
+_TIER_RE = re.compile(r"tier:\s*([A-Z][+\-]?)")
 
 def norm_text(s: str) -> str:
     """Lowercase, collapse whitespace, and normalize NBSP."""
@@ -81,18 +102,63 @@ DEFAULT_HEADERS = {
     "Connection": "keep-alive",
 }
 
-def fetch_html(session: requests.Session, url: str, retries: int = 3, timeout: int = 25) -> str:
-    last_err: Optional[Exception] = None
-    for attempt in range(1, retries + 1):
-        try:
-            r = session.get(url, headers=DEFAULT_HEADERS, timeout=timeout)
-            r.raise_for_status()
-            return r.text
-        except Exception as e:
-            last_err = e
-            if attempt < retries:
-                time.sleep(1.5 * attempt)
-    raise RuntimeError(f"Failed to fetch {url}: {last_err}")
+def make_session(retries: int = 3) -> requests.Session:
+    """
+    Keep-alive session for all page fetches: default headers set once, pooled
+    connections to mlcounter.com (no TCP/TLS handshake per hero), and
+    connection errors / 429 / 5xx retried with backoff inside urllib3.
+    """
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    retry = Retry(
+        total=retries,
+        backoff_factor=1.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET"]),
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_html(session: requests.Session, url: str, timeout: int = 25) -> bytes:
+    """
+    Raw response body. Decoding is left to the parser (lxml, in C) using the
+    page's own <meta charset>; r.text would first build the whole page as a
+    Python str, and falls back to ISO-8859-1 when the header has no charset.
+    """
+    try:
+        r = session.get(url, timeout=timeout)
+        r.raise_for_status()
+        return r.content
+    except requests.RequestException as e:
+        raise RuntimeError(f"Failed to fetch {url}: {e}") from e
+
+def fetch_all(
+    session: requests.Session,
+    pairs: List[Tuple[str, str]],
+    workers: int = 8,
+    sleep_min: float = 0.4,
+    sleep_max: float = 1.2,
+) -> Iterator[Tuple[str, str, bytes]]:
+    """
+    Fetch pages on up to `workers` threads sharing the pooled session, yielding
+    (name, url, html) in input order as soon as each page is in. Each fetch
+    sleeps its own jitter first, so requests overlap instead of queueing
+    behind one global sleep; 429s back off in the session's Retry.
+    """
+    def fetch(url: str) -> bytes:
+        time.sleep(random.uniform(sleep_min, sleep_max))
+        return fetch_html(session, url)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        futures = [(name, url, pool.submit(fetch, url)) for name, url in pairs]
+        for name, url, fut in futures:
+            yield name, url, fut.result()
+    finally:
+        # On error (or an abandoned generator) don't wait out the queued fetches
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 # -----------------------------
@@ -168,14 +234,27 @@ def extract_hero_list_from_columns(cols_div: Tag, max_items: int = 5) -> List[st
 
     return heroes
 
-def find_best_columns_after_heading(heading_p: Tag, max_columns_to_check: int = 50) -> Optional[Tag]:
+def find_best_columns_after_heading(
+    heading_p: Tag, max_columns_to_check: int = 50, scoped: bool = True
+) -> Optional[Tag]:
     """
-    Scan forward from heading_p and return the first wp-block-columns that
-    yields at least 1 hero figure.
+    Return the first wp-block-columns after heading_p that yields at least
+    1 hero figure. scoped=True only looks at heading_p's following sibling
+    divs (the block layout the counter sections use); scoped=False walks
+    every later element in the document.
     """
     if not heading_p:
         return None
 
+    if scoped:
+        candidates = heading_p.find_next_siblings(
+            "div", class_="wp-block-columns", limit=max_columns_to_check
+        )
+        for el in candidates:
+            if extract_hero_list_from_columns(el, max_items=5):
+                return el
+        return None
+
     checked = 0
     for el in heading_p.find_all_next():
         if not isinstance(el, Tag):
@@ -196,16 +275,28 @@ def find_best_columns_after_heading(heading_p: Tag, max_columns_to_check: int =
 
     return None
 
-def parse_role_lane_specialty_winrate_tier(
-    soup: BeautifulSoup
-) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[float], Optional[str]]:
+HeroMeta = Tuple[Optional[str], Optional[str], Optional[str], Optional[float], Optional[str]]
+P = TypeVar("P")  # a paragraph element: bs4 Tag or lxml HtmlElement
+
+def scan_paragraph_texts(paragraphs: Iterable[Tuple[P, str]]) -> Tuple[HeroMeta, List[P], List[P]]:
+    """
+    Single pass over (paragraph, text) pairs: picks up role/lane/specialty/
+    win rate/tier and collects the 'is weak against' / 'is strong against'
+    headings. Shared by the BeautifulSoup and lxml parsers.
+    """
     role = specialty = lane = tier = None
     win_rate: Optional[float] = None
+    weak_headings: List[P] = []
+    strong_headings: List[P] = []
 
-    for p in soup.find_all("p"):
-        t_raw = clean_text(p.get_text(" ", strip=True))
+    for p, t_raw in paragraphs:
         t = norm_text(t_raw)
 
+        if "is weak against" in t:
+            weak_headings.append(p)
+        if "is strong against" in t:
+            strong_headings.append(p)
+
         if t.startswith("role:"):
             role = clean_text(t_raw.split(":", 1)[1])
         elif t.startswith("specialty:"):
@@ -213,37 +304,176 @@ def parse_role_lane_specialty_winrate_tier(
         elif t.startswith("lane:"):
             lane = clean_text(t_raw.split(":", 1)[1])
         elif t.startswith("win rate:"):
-            m_wr = re.search(r"win rate:\s*([0-9]+(?:\.[0-9]+)?)\s*%", t, flags=re.I)
+            m_wr = _WIN_RATE_RE.search(t)
             if m_wr:
                 try:
                     win_rate = float(m_wr.group(1))
                 except ValueError:
                     pass
-            m_tier = re.search(r"tier:\s*([A-Z][+\-]?)", t_raw)
+            m_tier = _TIER_RE.search(t_raw)
             if m_tier:
                 tier = m_tier.group(1).strip()
 
-    return role, lane, specialty, win_rate, tier
+    return (role, lane, specialty, win_rate, tier), weak_headings, strong_headings
 
-def extract_counters(soup: BeautifulSoup, kind: str) -> List[str]:
+def scan_paragraphs(soup: BeautifulSoup) -> Tuple[HeroMeta, List[Tag], List[Tag]]:
+    """One find_all("p") sweep for the meta fields and both heading lists."""
+    return scan_paragraph_texts(
+        (p, clean_text(p.get_text(" ", strip=True))) for p in soup.find_all("p")
+    )
+
+def parse_role_lane_specialty_winrate_tier(soup: BeautifulSoup) -> HeroMeta:
+    return scan_paragraphs(soup)[0]
+
+def counters_from_headings(
+    headings: List[P],
+    find_columns: Callable[..., Optional[P]] = find_best_columns_after_heading,
+    hero_list: Callable[..., List[str]] = extract_hero_list_from_columns,
+) -> List[str]:
     """
     Key fix: try ALL matching headings and return the first one that
-    actually yields hero names.
+    actually yields hero names. Sibling-scoped search first, so a TOC copy
+    of the heading can't borrow the next section's grid; the full forward
+    walk is only the fallback.
     """
-    headings = find_all_counter_heading_p(soup, kind)
-    for hp in headings:
-        cols = find_best_columns_after_heading(hp)
-        heroes = extract_hero_list_from_columns(cols, max_items=5)
-        if heroes:
-            return heroes
+    for scoped in (True, False):
+        for hp in headings:
+            cols = find_columns(hp, scoped=scoped)
+            heroes = hero_list(cols, max_items=5)
+            if heroes:
+                return heroes
     return []
 
-def parse_hero_page(name: str, url: str, html: str) -> HeroRecord:
-    soup = BeautifulSoup(html, "html.parser")
-    role, lane, specialty, win_rate, tier = parse_role_lane_specialty_winrate_tier(soup)
+def extract_counters(soup: BeautifulSoup, kind: str) -> List[str]:
+    return counters_from_headings(find_all_counter_heading_p(soup, kind))
+
+# Everything the parsers below look at: info/heading <p>s and the
+# wp-block-columns <div>s with their figures. Nav, scripts, styles and other
+# boilerplate are skipped while the tree is built instead of materialized.
+PAGE_STRAINER = SoupStrainer(["p", "div", "figure", "figcaption", "a", "img"])
+
+
+# -----------------------------
+# lxml + XPath parsing (same rules as the BeautifulSoup helpers above)
+# -----------------------------
+
+if LXML_AVAILABLE:
+    _COLUMNS_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' wp-block-columns ')"
+    # Tag.get_text() skips comments and <script>/<style> strings; so does this
+    _TEXT_XPATH = etree.XPath(".//text()[not(ancestor::script) and not(ancestor::style)]")
+    _SIBLING_COLUMNS_XPATH = etree.XPath(f"following-sibling::div[{_COLUMNS_CLASS}]")
+    # find_all_next() order: the heading's own descendants, then what follows
+    _NEXT_COLUMNS_XPATH = etree.XPath(
+        f"descendant::div[{_COLUMNS_CLASS}] | following::div[{_COLUMNS_CLASS}]"
+    )
+
+def _lxml_text(el) -> str:
+    """lxml twin of Tag.get_text(" ", strip=True)"""
+    return " ".join(s for s in (t.strip() for t in _TEXT_XPATH(el)) if s)
+
+def _lxml_first(el, tag: str):
+    return next(el.iterdescendants(tag), None)
+
+def _lxml_hero_name_from_figure(fig) -> Optional[str]:
+    figcap = _lxml_first(fig, "figcaption")
+    if figcap is not None:
+        a = _lxml_first(figcap, "a")
+        if a is not None:
+            name = clean_text(_lxml_text(a))
+            if name:
+                return name
+
+        cap_text = clean_text(_lxml_text(figcap))
+        if cap_text:
+            return cap_text
+
+    img = _lxml_first(fig, "img")
+    if img is not None:
+        alt = clean_text(img.get("alt") or "")
+        if alt:
+            return alt
+
+    return None
+
+def _lxml_hero_list_from_columns(cols_div, max_items: int = 5) -> List[str]:
+    if cols_div is None:
+        return []
+
+    heroes: List[str] = []
+    seen = set()
+
+    for fig in cols_div.iterdescendants("figure"):
+        name = _lxml_hero_name_from_figure(fig)
+        if not name:
+            continue
+        key = name.strip().lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        heroes.append(name)
+        if len(heroes) >= max_items:
+            break
+
+    return heroes
+
+def _lxml_columns_after_heading(heading_p, max_columns_to_check: int = 50, scoped: bool = True):
+    if scoped:
+        for el in _SIBLING_COLUMNS_XPATH(heading_p)[:max_columns_to_check]:
+            if _lxml_hero_list_from_columns(el, max_items=5):
+                return el
+        return None
+
+    checked = 0
+    for el in _NEXT_COLUMNS_XPATH(heading_p):
+        if _lxml_hero_list_from_columns(el, max_items=5):
+            return el
+        checked += 1
+        if checked >= max_columns_to_check:
+            break
+    return None
+
+@lru_cache(maxsize=None)
+def _lxml_parser(encoding: str):
+    try:
+        return lxml.html.HTMLParser(encoding=encoding)
+    except LookupError:
+        return lxml.html.HTMLParser(encoding="utf-8")
+
+def _lxml_document(html: Union[bytes, str]):
+    """
+    Parse with lxml, decoding bytes in C using the page's declared charset
+    (UTF-8 if none). None for an empty/unparseable document.
+    """
+    parser = None
+    if isinstance(html, bytes):
+        declared = EncodingDetector.find_declared_encoding(html, is_html=True)
+        parser = _lxml_parser(declared or "utf-8")
+    try:
+        return lxml.html.document_fromstring(html, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None
 
-    weak_against = extract_counters(soup, "weak")
-    strong_against = extract_counters(soup, "strong")
+def _scan_hero_page(html: Union[bytes, str]) -> Tuple[HeroMeta, List[str], List[str]]:
+    """Meta fields plus the weak/strong counter lists for one page"""
+    if LXML_AVAILABLE:
+        doc = _lxml_document(html)
+        if doc is None:
+            return (None, None, None, None, None), [], []
+        meta, weak_headings, strong_headings = scan_paragraph_texts(
+            (p, clean_text(_lxml_text(p))) for p in doc.iter("p")
+        )
+        find_columns, hero_list = _lxml_columns_after_heading, _lxml_hero_list_from_columns
+    else:
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=PAGE_STRAINER)
+        meta, weak_headings, strong_headings = scan_paragraphs(soup)
+        find_columns, hero_list = find_best_columns_after_heading, extract_hero_list_from_columns
+
+    weak_against = counters_from_headings(weak_headings, find_columns, hero_list)
+    strong_against = counters_from_headings(strong_headings, find_columns, hero_list)
+    return meta, weak_against, strong_against
+
+def parse_hero_page(name: str, url: str, html: Union[bytes, str]) -> HeroRecord:
+    (role, lane, specialty, win_rate, tier), weak_against, strong_against = _scan_hero_page(html)
 
     return HeroRecord(
         name=name,
@@ -294,6 +524,12 @@ def parse_input_file(path: str) -> List[Tuple[str, str]]:
 
 def init_db(conn: sqlite3.Connection, fresh: bool = False) -> None:
     cur = conn.cursor()
+    # Only takes effect on a brand-new file (existing DBs need a VACUUM);
+    # 8KB pages halve the page reads for the counters/heroes scans
+    cur.execute("PRAGMA page_size=8192;")
+    # The shared connection settings (WAL included) only after page_size: a
+    # WAL database can no longer change its page size
+    cur.executescript(CONNECT_PRAGMAS)
     if fresh:
         cur.execute("DROP TABLE IF EXISTS counters;")
         cur.execute("DROP TABLE IF EXISTS heroes;")
@@ -326,9 +562,16 @@ def init_db(conn: sqlite3.Connection, fresh: bool = False) -> None:
     cur.execute("CREATE INDEX IF NOT EXISTS idx_counters_otherhero ON counters(other_hero);")
     conn.commit()
 
-def upsert_hero(conn: sqlite3.Connection, rec: HeroRecord) -> None:
+# Heroes written per transaction in main(); one commit (fsync) per batch
+# instead of per hero
+COMMIT_EVERY = 20
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def upsert_hero(conn: sqlite3.Connection, rec: HeroRecord, now: str) -> None:
+    """Write one hero and its counters stamped with `now`; the caller commits."""
     cur = conn.cursor()
-    now = datetime.now(timezone.utc).isoformat()
 
     cur.execute("""
     INSERT INTO heroes (hero, url, role, lane, specialty, win_rate, tier, updated_at)
@@ -345,19 +588,17 @@ def upsert_hero(conn: sqlite3.Connection, rec: HeroRecord) -> None:
 
     cur.execute("DELETE FROM counters WHERE hero = ?;", (rec.name,))
 
-    def _insert_many(items: List[str], relation: str):
-        if not items:
-            return
-        rows = [(rec.name, other, relation, now) for other in items if other]
-        cur.executemany("""
-            INSERT OR REPLACE INTO counters (hero, other_hero, relation, updated_at)
-            VALUES (?, ?, ?, ?);
-        """, rows)
-
-    _insert_many(rec.weak_against or [], "weak_against")
-    _insert_many(rec.strong_against or [], "strong_against")
-
-    conn.commit()
+    # The DELETE cleared this hero's rows, so a plain INSERT is enough (OR
+    # REPLACE would probe for and delete a conflicting row first); dict.fromkeys
+    # keeps order while guarding the primary key against repeated names
+    pairs = dict.fromkeys(
+        [(other, "weak_against") for other in rec.weak_against or [] if other]
+        + [(other, "strong_against") for other in rec.strong_against or [] if other]
+    )
+    cur.executemany("""
+        INSERT INTO counters (hero, other_hero, relation, updated_at)
+        VALUES (?, ?, ?, ?);
+    """, [(rec.name, other, relation, now) for other, relation in pairs])
 
 
 # -----------------------------
@@ -369,8 +610,9 @@ def main() -> None:
     ap.add_argument("--input", required=True, help="Path to hero URL list file (supports 'Name | URL').")
     ap.add_argument("--db", default="mlcounter.db", help="SQLite DB path (default: mlcounter.db).")
     ap.add_argument("--fresh", action="store_true", help="Drop & recreate tables (start from scratch).")
-    ap.add_argument("--sleep-min", type=float, default=0.4, help="Min sleep between requests (seconds).")
-    ap.add_argument("--sleep-max", type=float, default=1.2, help="Max sleep between requests (seconds).")
+    ap.add_argument("--sleep-min", type=float, default=0.4, help="Min sleep before each request (seconds).")
+    ap.add_argument("--sleep-max", type=float, default=1.2, help="Max sleep before each request (seconds).")
+    ap.add_argument("--workers", type=int, default=8, help="Concurrent page fetches (default: 8).")
     ap.add_argument("--limit", type=int, default=None, help="Only process first N heroes (debug).")
     args = ap.parse_args()
 
@@ -388,25 +630,42 @@ def main() -> None:
     try:
         init_db(conn, fresh=args.fresh)
 
-        session = requests.Session()
-
-        total = len(hero_pairs)
-        for i, (name, url) in enumerate(hero_pairs, start=1):
+        for name, url in hero_pairs:
             if not url.startswith("http"):
                 raise RuntimeError(f"Bad URL for {name}: {url!r}")
 
-            html = fetch_html(session, url)
+        session = make_session()
+
+        # Fetches run ahead concurrently; parsing and DB writes stay on this thread
+        total = len(hero_pairs)
+        pages = fetch_all(session, hero_pairs, args.workers, args.sleep_min, args.sleep_max)
+        now = utc_now()  # one updated_at per commit window
+        for i, (name, url, html) in enumerate(pages, start=1):
             rec = parse_hero_page(name, url, html)
-            upsert_hero(conn, rec)
+            # Each hero is its own savepoint inside the commit window: if the
+            # write is interrupted, only this hero's half-written rows are
+            # undone and the finally below still keeps the finished ones
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            conn.execute("SAVEPOINT hero")
+            try:
+                upsert_hero(conn, rec, now)
+            except BaseException:
+                conn.execute("ROLLBACK TO hero")
+                raise
+            conn.execute("RELEASE hero")
+            if i % COMMIT_EVERY == 0:
+                conn.commit()
+                now = utc_now()
 
             wa = len(rec.weak_against or [])
             sa = len(rec.strong_against or [])
             role = rec.role or "?"
             print(f"[{i}/{total}] Saved {rec.name:<14} | weak_against={wa:<2} strong_against={sa:<2} | role={role}")
 
-            time.sleep(random.uniform(args.sleep_min, args.sleep_max))
-
     finally:
+        # Keep every fully written hero, even if a later page failed
+        conn.commit()
         conn.close()
 
 
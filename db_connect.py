@@ -0,0 +1,34 @@
+"""
+db_connect.py - How every long-lived connection to mlcounter.db is opened
+
+One PRAGMA list for the app, the draft engine, the notes analyzer, the
+session tracker and the maintenance scripts. File-level settings
+(page_size) only apply to a new or VACUUMed file and are set by
+build_db.init_db, not here.
+"""
+
+import sqlite3
+
+# Per-connection settings. WAL lets the app's readers run alongside the
+# session tracker's writes; NORMAL syncs only at checkpoints (safe in WAL)
+CONNECT_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA busy_timeout=5000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+"""
+
+
+def connect(
+    db_path: str,
+    cache_kib: int = 65536,
+    check_same_thread: bool = True,
+    isolation_level: str = "",
+) -> sqlite3.Connection:
+    """Open db_path with CONNECT_PRAGMAS and a page cache of cache_kib KiB"""
+    conn = sqlite3.connect(
+        db_path, isolation_level=isolation_level, check_same_thread=check_same_thread
+    )
+    conn.executescript(CONNECT_PRAGMAS + f"PRAGMA cache_size=-{int(cache_kib)};")
+    return conn
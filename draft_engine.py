@@ -18,8 +18,18 @@ import json
 import os
 import re
 import sqlite3
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Literal, Tuple
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Literal, Tuple, Union
+
+from db_connect import connect
+
+# Optional: numpy (ships with pandas) scores large pools as matrix ops
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 
 # -----------------------------
@@ -27,6 +37,13 @@ from typing import Dict, List, Optional, Literal, Tuple
 # -----------------------------
 
 _WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_NUM_RE = re.compile(r"([0-9]+(?:\.[0-9]+)?)")
+_EMPTY: frozenset = frozenset()
+
+# Pools at least this large (with more heroes than top_n) are pre-ranked with
+# numpy so the full per-hero work only runs for the top_n survivors
+VECTORIZE_MIN_POOL = 24
 
 def clean_text(s: str) -> str:
     if s is None:
@@ -35,16 +52,18 @@ def clean_text(s: str) -> str:
     s = _WS_RE.sub(" ", s)
     return s.strip()
 
+# Hero names repeat across every resolve/meta lookup; memoized per process
+@lru_cache(maxsize=4096)
 def normalize_key(s: str) -> str:
     s = clean_text(s).lower()
-    s = re.sub(r"[^a-z0-9]+", "", s)
+    s = _NON_ALNUM_RE.sub("", s)
     return s
 
 def parse_percent(x: Optional[str]) -> Optional[float]:
     if not x:
         return None
     x = clean_text(x)
-    m = re.search(r"([0-9]+(?:\.[0-9]+)?)", x)
+    m = _NUM_RE.search(x)
     if not m:
         return None
     try:
@@ -80,6 +99,21 @@ def render_explanation(reasons: List[Reason], max_reasons: int = 4) -> str:
 # Data classes
 # -----------------------------
 
+@dataclass(frozen=True, slots=True)
+class Weights:
+    """Scoring weights; frozen so a Weights value can key caches"""
+    strong_hit: float = 1.25
+    weak_hit: float = -1.25
+    win: float = 0.18
+    pick: float = 0.02
+    ban: float = 0.05
+    tier: float = 0.75
+    # NEW: Personal performance weights
+    personal_wr: float = 0.08    # Weight for personal win rate deviation from 50%
+    matchup_win: float = 1.5     # Bonus for winning matchup history
+    matchup_loss: float = -1.8   # Penalty for losing matchup history
+    min_games_confidence: int = 5  # Minimum games for high confidence
+
 @dataclass
 class PersonalStats:
     """Personal performance statistics for a hero"""
@@ -120,38 +154,45 @@ class PickResult:
 # -----------------------------
 
 class DraftEngine:
+    DEFAULT_WEIGHTS: Dict[str, float] = asdict(Weights())
+
     def __init__(
         self,
         db_path: str = "mlcounter.db",
         meta_path: str = "meta.json",
-        weights: Optional[Dict[str, float]] = None,
+        weights: Optional[Union[Weights, Dict[str, float]]] = None,
     ):
-        self.conn = sqlite3.connect(db_path)
+        # check_same_thread=False: the app caches one engine per DB and
+        # Streamlit reruns may execute on different script threads.
+        # Read-mostly (counters/heroes lookups), so the mmap in CONNECT_PRAGMAS
+        # serves pages from the mapping instead of one pread() per page
+        self.conn = connect(db_path, check_same_thread=False)
         self.cur = self.conn.cursor()
 
         self.hero_key_to_dbname = self._build_db_hero_index()
+        self.strong_of, self.weak_of = self._build_counter_index()
+        # Reverse maps for inverse hits: weak_by[h] = heroes listed as weak
+        # against h (so h is strong vs them), strong_by[h] likewise
+        self.weak_by = self._invert_index(self.weak_of)
+        self.strong_by = self._invert_index(self.strong_of)
+        if NUMPY_AVAILABLE:
+            self._build_counter_matrices()
 
         self.meta = self._load_meta(meta_path)
         self.meta_key_to_name = {normalize_key(k): k for k in self.meta.keys()} if self.meta else {}
 
         self.aliases = self._build_aliases()
 
-        # Default weights
-        self.w = {
-            "strong_hit": 1.25,
-            "weak_hit": -1.25,
-            "win": 0.18,
-            "pick": 0.02,
-            "ban": 0.05,
-            "tier": 0.75,
-            # NEW: Personal performance weights
-            "personal_wr": 0.08,  # Weight for personal win rate deviation from 50%
-            "matchup_win": 1.5,   # Bonus for winning matchup history
-            "matchup_loss": -1.8, # Penalty for losing matchup history
-            "min_games_confidence": 5,  # Minimum games for high confidence
-        }
-        if weights:
-            self.w.update(weights)
+        # Meta bonus depends only on meta.json and the weights: cached per hero
+        # (and as a numpy vector per hero index), reset when weights change
+        self._meta_cache: Dict[str, Tuple[float, List[Reason]]] = {}
+        self._meta_vec = None
+        self.set_weights(weights)
+
+        # Optional pre-aggregated game_history tables; see preload_matchups()
+        # and preload_personal_stats()
+        self._matchups: Optional[Dict[Tuple[str, str], Tuple[int, int]]] = None
+        self._personal: Optional[Dict[str, Tuple[int, int]]] = None
 
         self.tier_value = {
             "S+": 1.5, "S": 1.2, "S-": 1.0,
@@ -161,6 +202,32 @@ class DraftEngine:
             "PENDING ANALYSIS": 0.0,
         }
 
+    def set_weights(self, weights: Optional[Union[Weights, Dict[str, float]]] = None):
+        """Reset to the default weights, then apply any overrides."""
+        old = getattr(self, "w", None)
+        self.w = dict(self.DEFAULT_WEIGHTS)
+        if isinstance(weights, Weights):
+            self.w.update(asdict(weights))
+        elif weights:
+            self.w.update(weights)
+        if self.w != old:
+            self._meta_cache.clear()
+            self._meta_vec = None
+
+    def preload_matchups(self, table: Optional[Dict[Tuple[str, str], Tuple[int, int]]]):
+        """
+        Serve _get_matchup_stats from a pre-aggregated (hero, enemy) -> (wins, losses)
+        table instead of one matchup_stats lookup per pair. Pass None to go back to SQL.
+        """
+        self._matchups = table
+
+    def preload_personal_stats(self, table: Optional[Dict[str, Tuple[int, int]]]):
+        """
+        Serve _get_personal_stats from a hero -> (total_games, wins) table instead
+        of one COUNT query per hero. Pass None to go back to SQL.
+        """
+        self._personal = table
+
     def close(self):
         self.conn.close()
 
@@ -173,6 +240,52 @@ class DraftEngine:
             out[normalize_key(hero)] = hero
         return out
 
+    def _build_counter_index(self) -> Tuple[Dict[str, frozenset], Dict[str, frozenset]]:
+        """
+        The whole counters table (a few thousand rows at most) as
+        hero -> {other heroes} maps for strong_against / weak_against, so
+        recommend() does set intersections instead of SQL per pool hero.
+        """
+        strong: Dict[str, set] = {}
+        weak: Dict[str, set] = {}
+        self.cur.execute(
+            "SELECT hero, other_hero, relation FROM counters "
+            "WHERE relation IN ('strong_against', 'weak_against')"
+        )
+        for hero, other, relation in self.cur.fetchall():
+            target = strong if relation == "strong_against" else weak
+            target.setdefault(hero, set()).add(other)
+        return (
+            {h: frozenset(v) for h, v in strong.items()},
+            {h: frozenset(v) for h, v in weak.items()},
+        )
+
+    @staticmethod
+    def _invert_index(index: Dict[str, frozenset]) -> Dict[str, frozenset]:
+        inverted: Dict[str, set] = {}
+        for hero, others in index.items():
+            for other in others:
+                inverted.setdefault(other, set()).add(hero)
+        return {h: frozenset(v) for h, v in inverted.items()}
+
+    def _build_counter_matrices(self):
+        """
+        strong_of / weak_of as dense int8 hero x hero matrices (row = hero,
+        column = other hero) over every DB hero, for _vector_top_pool().
+        """
+        self._hero_names = sorted(set(self.hero_key_to_dbname.values()))
+        self._hero_idx = {h: i for i, h in enumerate(self._hero_names)}
+        n = len(self._hero_names)
+        self._strong_mat = np.zeros((n, n), dtype=np.int8)
+        self._weak_mat = np.zeros((n, n), dtype=np.int8)
+        for index, mat in ((self.strong_of, self._strong_mat), (self.weak_of, self._weak_mat)):
+            for hero, others in index.items():
+                i = self._hero_idx.get(hero)
+                if i is None:
+                    continue
+                cols = [self._hero_idx[o] for o in others if o in self._hero_idx]
+                mat[i, cols] = 1
+
     def _load_meta(self, path: str) -> Dict:
         if not path or not os.path.exists(path):
             return {}
@@ -221,33 +334,14 @@ class DraftEngine:
             return None
         return self.meta.get(meta_name)
 
-    # ---------- DB queries ----------
-
-    def _get_relation_list(self, hero: str, relation: str) -> List[str]:
-        self.cur.execute(
-            "SELECT other_hero FROM counters WHERE hero = ? AND relation = ?",
-            (hero, relation),
-        )
-        return [r[0] for r in self.cur.fetchall()]
-
-    def _get_relation_hits(self, hero: str, enemies: List[str], relation: str) -> List[str]:
-        if not enemies:
-            return []
-        placeholders = ",".join(["?"] * len(enemies))
-        q = f"""
-        SELECT other_hero
-        FROM counters
-        WHERE hero = ?
-          AND relation = ?
-          AND other_hero IN ({placeholders})
-        """
-        self.cur.execute(q, [hero, relation, *enemies])
-        return [r[0] for r in self.cur.fetchall()]
-
     # ---------- personal performance queries ----------
 
     def _get_personal_stats(self, hero: str) -> PersonalStats:
         """Get overall personal stats for a hero"""
+        if self._personal is not None:
+            total, wins = self._personal.get(hero, (0, 0))
+            return self._personal_stats_from_counts(total, wins)
+
         try:
             self.cur.execute("""
                 SELECT 
@@ -258,66 +352,98 @@ class DraftEngine:
             """, (hero,))
             
             row = self.cur.fetchone()
-            if row and row[0] > 0:
-                total, wins = row[0], row[1] or 0
-                losses = total - wins
-                win_rate = (wins / total * 100) if total > 0 else 0
-                
-                # Confidence levels
-                if total >= self.w["min_games_confidence"]:
-                    confidence = "high"
-                elif total >= 3:
-                    confidence = "medium"
-                elif total >= 1:
-                    confidence = "low"
-                else:
-                    confidence = "none"
-                
-                return PersonalStats(
-                    total_games=total,
-                    wins=wins,
-                    losses=losses,
-                    win_rate=win_rate,
-                    confidence=confidence
-                )
+            if row:
+                return self._personal_stats_from_counts(row[0], row[1] or 0)
         except sqlite3.OperationalError:
             # Table doesn't exist yet
             pass
         
         return PersonalStats(0, 0, 0, 0.0, "none")
 
+    def _personal_stats_from_counts(self, total: int, wins: int) -> PersonalStats:
+        if total <= 0:
+            return PersonalStats(0, 0, 0, 0.0, "none")
+
+        losses = total - wins
+        win_rate = (wins / total * 100) if total > 0 else 0
+        
+        # Confidence levels
+        if total >= self.w["min_games_confidence"]:
+            confidence = "high"
+        elif total >= 3:
+            confidence = "medium"
+        elif total >= 1:
+            confidence = "low"
+        else:
+            confidence = "none"
+        
+        return PersonalStats(
+            total_games=total,
+            wins=wins,
+            losses=losses,
+            win_rate=win_rate,
+            confidence=confidence
+        )
+
     def _get_matchup_stats(self, hero: str, enemy: str) -> Optional[MatchupStats]:
         """Get specific matchup history (hero vs enemy)"""
-        try:
-            self.cur.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN result = 'Win' THEN 1 ELSE 0 END) as wins
-                FROM game_history
-                WHERE your_hero = ?
-                  AND enemies LIKE ?
-            """, (hero, f'%"{enemy}"%'))
-            
-            row = self.cur.fetchone()
-            if row and row[0] > 0:
-                total, wins = row[0], row[1] or 0
-                losses = total - wins
-                win_rate = (wins / total * 100) if total > 0 else 0
-                
+        if self._matchups is not None:
+            wins, losses = self._matchups.get((hero, enemy), (0, 0))
+            total = wins + losses
+            if total > 0:
                 return MatchupStats(
                     wins=wins,
                     losses=losses,
                     total=total,
-                    win_rate=win_rate
+                    win_rate=wins / total * 100
                 )
+            return None
+
+        try:
+            # Primary-key lookup in the roll-up maintained by app.py's triggers
+            self.cur.execute(
+                "SELECT games, wins FROM matchup_stats WHERE hero = ? AND enemy = ?",
+                (hero, enemy),
+            )
         except sqlite3.OperationalError:
-            pass
-        
+            # No roll-up on this DB yet: scan game_history instead
+            try:
+                self.cur.execute("""
+                    SELECT
+                        COUNT(*) as total,
+                        SUM(CASE WHEN result = 'Win' THEN 1 ELSE 0 END) as wins
+                    FROM game_history
+                    WHERE your_hero = ?
+                      AND enemies LIKE ?
+                """, (hero, f'%"{enemy}"%'))
+            except sqlite3.OperationalError:
+                return None
+
+        row = self.cur.fetchone()
+        if row and row[0] > 0:
+            total, wins = row[0], row[1] or 0
+            losses = total - wins
+            win_rate = (wins / total * 100) if total > 0 else 0
+
+            return MatchupStats(
+                wins=wins,
+                losses=losses,
+                total=total,
+                win_rate=win_rate
+            )
+
         return None
 
     # ---------- meta scoring ----------
 
     def _meta_bonus_and_reasons(self, hero: str) -> Tuple[float, List[Reason]]:
+        cached = self._meta_cache.get(hero)
+        if cached is None:
+            cached = self._meta_cache[hero] = self._compute_meta_bonus(hero)
+        total, reasons = cached
+        return total, list(reasons)
+
+    def _compute_meta_bonus(self, hero: str) -> Tuple[float, List[Reason]]:
         m = self.resolve_meta_entry(hero)
         if not m:
             return 0.0, []
@@ -413,6 +539,58 @@ class DraftEngine:
         
         return total_bonus, reasons, warnings
 
+    # ---------- vectorized pre-ranking ----------
+
+    def _meta_vector(self):
+        """Meta bonus for every hero index under the current weights"""
+        if self._meta_vec is None:
+            self._meta_vec = np.array(
+                [self._meta_bonus_and_reasons(h)[0] for h in self._hero_names],
+                dtype=np.float64,
+            )
+        return self._meta_vec
+
+    def _vector_top_pool(
+        self,
+        db_pool: List[str],
+        db_enemies: List[str],
+        base_score: float,
+        top_n: int,
+        use_inverse: bool,
+        use_personal: bool,
+    ) -> List[str]:
+        """
+        Score the whole pool with matrix ops (same arithmetic, in the same
+        order, as recommend()'s per-hero loop) and return the pool entries
+        that make the top_n, in their original pool order. recommend() then
+        builds hits, reasons and tips only for those.
+        """
+        rows = np.fromiter((self._hero_idx[h] for h in db_pool), dtype=np.intp, count=len(db_pool))
+        cols = np.array(sorted({self._hero_idx[e] for e in db_enemies}), dtype=np.intp)
+
+        strong = self._strong_mat[np.ix_(rows, cols)]
+        weak = self._weak_mat[np.ix_(rows, cols)]
+        if use_inverse:
+            # Enemy weak against hero = hero strong against enemy, and vice versa
+            strong = strong | self._weak_mat[np.ix_(cols, rows)].T
+            weak = weak | self._strong_mat[np.ix_(cols, rows)].T
+
+        counter = (
+            strong.sum(axis=1, dtype=np.int64) * self.w["strong_hit"]
+            + weak.sum(axis=1, dtype=np.int64) * self.w["weak_hit"]
+        )
+        score = base_score + counter + self._meta_vector()[rows]
+        if use_personal:
+            score = score + np.array([
+                self._personal_bonus_and_reasons(h, db_enemies, self._get_personal_stats(h))[0]
+                for h in db_pool
+            ])
+
+        # Rank on the rounded score with a stable sort, as results.sort() does
+        rounded = np.array([round(float(x), 3) for x in score])
+        keep = np.sort(np.argsort(-rounded, kind="stable")[:top_n])
+        return [db_pool[i] for i in keep]
+
     # ---------- recommend ----------
 
     def recommend(
@@ -440,15 +618,6 @@ class DraftEngine:
             if v:
                 db_pool.append(v)
 
-        # Cache inverse lists ONCE per call
-        enemy_cache: Dict[str, Dict[str, set]] = {}
-        if use_inverse:
-            for e in db_enemies:
-                enemy_cache[e] = {
-                    "weak": set(self._get_relation_list(e, "weak_against")),
-                    "strong": set(self._get_relation_list(e, "strong_against")),
-                }
-
         def uniq(seq: List[str]) -> List[str]:
             out: List[str] = []
             seen = set()
@@ -458,24 +627,33 @@ class DraftEngine:
                     out.append(x)
             return out
 
+        enemy_set = frozenset(db_enemies)
+        enemy_order = uniq(db_enemies)
+
+        if NUMPY_AVAILABLE and len(db_pool) >= VECTORIZE_MIN_POOL and len(db_pool) > top_n:
+            db_pool = self._vector_top_pool(
+                db_pool, db_enemies, base_score, top_n, use_inverse, use_personal
+            )
+
         results: List[PickResult] = []
 
         for hero in db_pool:
             reasons: List[Reason] = []
 
             # 1. Counter analysis (direct hits)
-            strong_direct = self._get_relation_hits(hero, db_enemies, "strong_against")
-            weak_direct = self._get_relation_hits(hero, db_enemies, "weak_against")
+            strong_direct = sorted(self.strong_of.get(hero, _EMPTY) & enemy_set)
+            weak_direct = sorted(self.weak_of.get(hero, _EMPTY) & enemy_set)
 
-            # 2. Inverse hits (enemy -> hero)
+            # 2. Inverse hits (enemy -> hero), kept in enemy order
             strong_inv: List[str] = []
             weak_inv: List[str] = []
             if use_inverse and db_enemies:
-                for e in db_enemies:
-                    if hero in enemy_cache[e]["weak"]:
-                        strong_inv.append(e)
-                    if hero in enemy_cache[e]["strong"]:
-                        weak_inv.append(e)
+                inv = self.weak_by.get(hero, _EMPTY) & enemy_set
+                if inv:
+                    strong_inv = [e for e in enemy_order if e in inv]
+                inv = self.strong_by.get(hero, _EMPTY) & enemy_set
+                if inv:
+                    weak_inv = [e for e in enemy_order if e in inv]
 
             strong_hits = uniq(strong_direct + strong_inv)
             weak_hits = uniq(weak_direct + weak_inv)
@@ -487,11 +665,6 @@ class DraftEngine:
 
             # Add counter reasons
             if strong_hits:
-                src_note = []
-                if strong_direct:
-                    src_note.append("direct")
-                if strong_inv:
-                    src_note.append("inverse")
                 reasons.append(
                     Reason(
                         "counter_strong",
@@ -501,11 +674,6 @@ class DraftEngine:
                 )
 
             if weak_hits:
-                src_note = []
-                if weak_direct:
-                    src_note.append("direct")
-                if weak_inv:
-                    src_note.append("inverse")
                 reasons.append(
                     Reason(
                         "counter_weak",
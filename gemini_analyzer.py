@@ -9,9 +9,14 @@ Gemini offers generous free tier:
 Perfect for hobby projects!
 """
 
+import hashlib
 import json
 import os
-from typing import List, Dict, Optional
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, List, Dict, Optional, Union
 
 # You'll need: pip install google-generativeai
 try:
@@ -20,11 +25,129 @@ try:
 except ImportError:
     GEMINI_AVAILABLE = False
 
+# Optional: pip install orjson (faster JSON parsing)
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Optional: pip install msgspec (schema-typed response parsing)
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+if MSGSPEC_AVAILABLE:
+    # Response schema (mirrors OUTPUT FORMAT in the analysis prompt).
+    # Fields default to UNSET so absent keys stay absent and explicit nulls
+    # stay None; unknown keys and off-type values are rejected, and
+    # _parse_ai_response falls back to a plain JSON parse for those replies.
+    # Either way the result has the same shape as json.loads would give.
+    from msgspec import UNSET, UnsetType
+
+    class AIMistake(msgspec.Struct, forbid_unknown_fields=True):
+        hero: Union[str, None, UnsetType] = UNSET
+        pattern: Union[str, None, UnsetType] = UNSET
+        frequency: Union[int, float, str, None, UnsetType] = UNSET
+        evidence: Union[List[str], None, UnsetType] = UNSET
+        recommendation: Union[str, None, UnsetType] = UNSET
+        severity: Union[str, None, UnsetType] = UNSET
+
+    class AILearning(msgspec.Struct, forbid_unknown_fields=True):
+        hero: Union[str, None, UnsetType] = UNSET
+        insight: Union[str, None, UnsetType] = UNSET
+        context: Union[str, None, UnsetType] = UNSET
+        application: Union[str, None, UnsetType] = UNSET
+
+    class AIMatchup(msgspec.Struct, forbid_unknown_fields=True):
+        hero: Union[str, None, UnsetType] = UNSET
+        enemy: Union[str, None, UnsetType] = UNSET
+        pattern: Union[str, None, UnsetType] = UNSET
+        win_rate_noted: Union[int, float, str, None, UnsetType] = UNSET
+        tip: Union[str, None, UnsetType] = UNSET
+
+    class AIRecommendation(msgspec.Struct, forbid_unknown_fields=True):
+        priority: Union[str, None, UnsetType] = UNSET
+        type: Union[str, None, UnsetType] = UNSET
+        hero: Union[str, None, UnsetType] = UNSET
+        recommendation: Union[str, None, UnsetType] = UNSET
+        impact: Union[str, None, UnsetType] = UNSET
+
+    class AIAnalysisResponse(msgspec.Struct, forbid_unknown_fields=True):
+        mistakes: Union[List[AIMistake], UnsetType] = UNSET
+        learnings: Union[List[AILearning], UnsetType] = UNSET
+        matchups: Union[List[AIMatchup], UnsetType] = UNSET
+        top_recommendations: Union[List[AIRecommendation], UnsetType] = UNSET
+
+    _response_decoder = msgspec.json.Decoder(AIAnalysisResponse)
+    _decode_errors = (json.JSONDecodeError, msgspec.DecodeError)
+else:
+    _decode_errors = (json.JSONDecodeError,)
+
+
+class TokenBucketLimiter:
+    """
+    Per-minute request + token buckets (free tier: 15 RPM, 1M TPM).
+    acquire() sleeps until both buckets can cover the call instead of
+    letting bursts run into 429 errors.
+    """
+    
+    def __init__(self, rpm: int = 15, tpm: int = 1_000_000):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._rpm_tokens = float(rpm)
+        self._tpm_tokens = float(tpm)
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self._rpm_tokens = min(self.rpm, self._rpm_tokens + elapsed * self.rpm / 60.0)
+        self._tpm_tokens = min(self.tpm, self._tpm_tokens + elapsed * self.tpm / 60.0)
+    
+    def acquire(self, est_tokens: int):
+        """Block until one request and est_tokens tokens are available, then take them"""
+        est_tokens = min(max(est_tokens, 1), self.tpm)
+        with self._lock:
+            while True:
+                self._refill()
+                if self._rpm_tokens >= 1 and self._tpm_tokens >= est_tokens:
+                    self._rpm_tokens -= 1
+                    self._tpm_tokens -= est_tokens
+                    return
+                wait_rpm = (1 - self._rpm_tokens) * 60.0 / self.rpm
+                wait_tpm = (est_tokens - self._tpm_tokens) * 60.0 / self.tpm
+                time.sleep(max(wait_rpm, wait_tpm, 0.01))
+
+
+# Shared by every analyzer in the process (Streamlit builds one per click)
+_rate_limiter = TokenBucketLimiter()
+
 
 class GeminiNotesAnalyzer:
     """AI-powered notes analysis using FREE Google Gemini API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Newest notes kept per hero in the analysis prompt (token budget)
+    MAX_NOTES_PER_HERO = 40
+    
+    # Response cache modes:
+    #   enabled   - read cached responses, store new ones
+    #   read_only - read cached responses, never store
+    #   replay    - only serve cached responses (never calls the API)
+    #   disabled  - always call the API
+    CACHE_MODES = ("enabled", "read_only", "replay", "disabled")
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        db_path: str = "mlcounter.db",
+        cache_mode: str = "enabled",
+    ):
         if not GEMINI_AVAILABLE:
             raise ImportError("google-generativeai not installed. Run: pip install google-generativeai")
         
@@ -41,7 +164,87 @@ class GeminiNotesAnalyzer:
         genai.configure(api_key=self.api_key)
         
         # Use Gemini 1.5 Flash (correct model name for 2024)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.model_name = 'gemini-2.5-flash'
+        self.model = genai.GenerativeModel(self.model_name)
+        
+        if cache_mode not in self.CACHE_MODES:
+            raise ValueError(f"cache_mode must be one of {self.CACHE_MODES}")
+        self.db_path = db_path
+        self.cache_mode = cache_mode
+        if cache_mode != "disabled":
+            self._ensure_cache_table()
+    
+    # ---------- response cache ----------
+    
+    def _ensure_cache_table(self):
+        """Create prompt_cache table if not exists"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS prompt_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+        conn.close()
+    
+    def _cache_key(self, prompt: str, kind: str) -> str:
+        return hashlib.sha256(f"{prompt}|{self.model_name}|{kind}".encode("utf-8")).hexdigest()
+    
+    def _call_model(self, prompt: str) -> str:
+        """Rate-limited Gemini call (~4 chars per token estimate)"""
+        _rate_limiter.acquire(len(prompt) // 4)
+        return self.model.generate_content(prompt).text
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT response FROM prompt_cache WHERE key = ?", (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+    
+    def _cache_put(self, key: str, text: str):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO prompt_cache (key, response) VALUES (?, ?)",
+                (key, text),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _generate(self, prompt: str, kind: str, accept: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Call Gemini (or serve from the response cache) and return response text.
+        
+        A reply is cached - and a cached reply served - only if accept(text)
+        is true, so malformed or empty replies are never kept.
+        """
+        if self.cache_mode == "disabled":
+            return self._call_model(prompt)
+        
+        key = self._cache_key(prompt, kind)
+        cached = self._cache_get(key)
+        if cached is not None and (accept is None or accept(cached)):
+            return cached
+        
+        if self.cache_mode == "replay":
+            raise RuntimeError("No cached Gemini response for this prompt (replay mode)")
+        
+        # No connection is held open across the network call
+        text = self._call_model(prompt)
+        
+        if self.cache_mode == "enabled" and (accept is None or accept(text)):
+            self._cache_put(key, text)
+        return text
+    
+    def _is_valid_response(self, response_text: str) -> bool:
+        return "parse_error" not in self._parse_ai_response(response_text)
     
     def analyze_notes(self, notes: List[Dict], focus: str = "all") -> Dict:
         """
@@ -57,19 +260,23 @@ class GeminiNotesAnalyzer:
         if not notes:
             return {"error": "No notes to analyze"}
         
-        # Build the prompt
-        prompt = self._build_analysis_prompt(notes, focus)
+        # Build the prompt from the per-hero capped selection
+        by_hero = self._group_notes(notes)
+        notes_sent = sum(len(hero_notes) for hero_notes in by_hero.values())
+        prompt = self._build_analysis_prompt(by_hero, focus)
         
         try:
-            # Call Gemini API
-            response = self.model.generate_content(prompt)
+            # Call Gemini API (cached by prompt hash)
+            response_text = self._generate(prompt, "analyze", accept=self._is_valid_response)
             
             # Parse JSON response
-            insights = self._parse_ai_response(response.text)
+            insights = self._parse_ai_response(response_text)
             
             return {
                 "success": True,
-                "total_notes_analyzed": len(notes),
+                "total_notes_analyzed": notes_sent,
+                "total_notes_provided": len(notes),
+                "notes_truncated": len(notes) - notes_sent,
                 "insights": insights,
                 "model": "gemini-1.5-flash",
                 "cost": "FREE! 🎉"
@@ -82,30 +289,34 @@ class GeminiNotesAnalyzer:
                 "fallback": "Use pattern-based analysis instead"
             }
     
-    def _build_analysis_prompt(self, notes: List[Dict], focus: str) -> str:
-        """Build analysis prompt for Gemini"""
-        
-        # Group notes by hero
-        by_hero = {}
+    def _group_notes(self, notes: List[Dict]) -> Dict[str, List[Dict]]:
+        """Group notes by hero, capped per hero to bound prompt tokens"""
+        by_hero = defaultdict(list)
         for note in notes:
-            hero = note['your_hero']
-            if hero not in by_hero:
-                by_hero[hero] = []
-            by_hero[hero].append(note)
+            hero_notes = by_hero[note['your_hero']]
+            if len(hero_notes) < self.MAX_NOTES_PER_HERO:
+                hero_notes.append(note)
+        return by_hero
+    
+    def _build_analysis_prompt(self, by_hero: Dict[str, List[Dict]], focus: str) -> str:
+        """Build analysis prompt for Gemini from _group_notes() output"""
         
-        prompt = f"""You are analyzing Mobile Legends: Bang Bang game notes from a player.
-Extract actionable insights from these {len(notes)} game notes.
+        total_notes = sum(len(hero_notes) for hero_notes in by_hero.values())
+        
+        def _chunks():
+            yield f"""You are analyzing Mobile Legends: Bang Bang game notes from a player.
+Extract actionable insights from these {total_notes} game notes.
 
 NOTES DATA:
 """
-        
-        for hero, hero_notes in by_hero.items():
-            prompt += f"\n{hero} ({len(hero_notes)} games):\n"
-            for note in hero_notes:
-                enemies_str = ", ".join(note['enemies']) if note['enemies'] else "Unknown"
-                prompt += f"  [{note['result']}] vs {enemies_str}: {note['notes']}\n"
-        
-        prompt += """
+            
+            for hero, hero_notes in by_hero.items():
+                yield f"\n{hero} ({len(hero_notes)} games):\n"
+                for note in hero_notes:
+                    enemies_str = ", ".join(note['enemies']) if note['enemies'] else "Unknown"
+                    yield f"  [{note['result']}] vs {enemies_str}: {note['notes']}\n"
+            
+            yield """
 
 TASK: Analyze these notes and extract:
 
@@ -175,7 +386,8 @@ IMPORTANT:
 - Include evidence quotes from notes
 """
         
-        return prompt
+        # Single join instead of repeated += concatenation
+        return "".join(_chunks())
     
     def _parse_ai_response(self, response_text: str) -> Dict:
         """Parse Gemini's response into structured format"""
@@ -194,9 +406,16 @@ IMPORTANT:
         cleaned = cleaned.strip()
         
         try:
-            insights = json.loads(cleaned)
+            if MSGSPEC_AVAILABLE:
+                # Parse + validate in one pass, then hand back plain dicts;
+                # replies that don't fit the schema get the plain parse below
+                try:
+                    return msgspec.to_builtins(_response_decoder.decode(cleaned))
+                except msgspec.ValidationError:
+                    pass
+            insights = json_loads(cleaned)
             return insights
-        except json.JSONDecodeError as e:
+        except _decode_errors as e:
             # If parsing fails, return error with raw text
             return {
                 "parse_error": str(e),
@@ -221,8 +440,7 @@ IMPORTANT:
         prompt += "\nProvide a brief, actionable summary of the main patterns you see."
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate(prompt, "summarize", accept=lambda text: bool(text.strip())).strip()
         except Exception as e:
             return f"Error generating summary: {e}"
 
@@ -260,7 +478,8 @@ No credit card required! 🎉
 def test_gemini_connection(api_key: str) -> bool:
     """Test if Gemini API key works"""
     try:
-        analyzer = GeminiNotesAnalyzer(api_key)
+        # Bypass the response cache so the key is really exercised
+        analyzer = GeminiNotesAnalyzer(api_key, cache_mode="disabled")
         test_notes = [{
             'your_hero': 'Thamuz',
             'enemies': ['Alpha'],
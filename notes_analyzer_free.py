@@ -11,12 +11,140 @@ Uses local NLP techniques to extract insights:
 """
 
 import json
+import os
 import sqlite3
 import re
+import threading
+from multiprocessing import Pool
+from types import MappingProxyType
 from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 from collections import Counter, defaultdict
 
+from db_connect import connect
+
+# Optional: pip install orjson (faster JSON decoding of enemies lists)
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Optional: pip install pyahocorasick (multi-keyword search in one pass)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# Column order of the get_all_notes query; rows are zipped onto these keys
+NOTE_COLUMNS = ('game_id', 'your_hero', 'enemies', 'date', 'result', 'notes', 'notes_lc')
+
+
+# Note patterns per category (matched against lowercased note text)
+MISTAKE_PATTERNS = {
+    'early_trade': [
+        r'traded? too early',
+        r'without level \d',
+        r'before level \d',
+        r'rushed? level',
+        r'ignored? (?:his|her|their) damage',
+    ],
+    'forgot': [
+        r'forgot',
+        r'didn\'t remember',
+        r'should have remembered',
+        r'keep forgetting',
+    ],
+    'positioning': [
+        r'bad position',
+        r'wrong position',
+        r'got caught',
+        r'out of position',
+    ],
+    'timing': [
+        r'too late',
+        r'too soon',
+        r'bad timing',
+        r'wrong time',
+    ],
+    'spell_usage': [
+        r'wasted? (?:spell|skill)',
+        r'used? .* too early',
+        r'(?:spell|skill) on cooldown',
+    ],
+}
+
+LEARNING_PATTERNS = {
+    'power_spike': [
+        r'level \d+ (?:power|spike|advantage)',
+        r'strong at level',
+        r'wait for level',
+    ],
+    'counter_play': [
+        r'counter',
+        r'can beat',
+        r'weak against',
+        r'strong against',
+    ],
+    'strategy': [
+        r'(?:good|better) to',
+        r'should (?:have )?',
+        r'learned? that',
+        r'realized? that',
+    ],
+}
+
+
+# (category, compiled alternation) pairs
+CompiledGroups = Tuple[Tuple[str, re.Pattern], ...]
+
+
+def compile_pattern_groups(groups: Dict[str, List[str]]) -> CompiledGroups:
+    """
+    Fold each category's patterns into one alternation (one scan per category).
+    Patterns are matched against already-lowercased text, so no IGNORECASE.
+    """
+    return tuple(
+        (name, re.compile("|".join(f"(?:{p})" for p in patterns)))
+        for name, patterns in groups.items()
+    )
+
+
+def compile_any_pattern(*groups: Dict[str, List[str]]) -> re.Pattern:
+    """
+    One alternation over every pattern in every category. A miss here means
+    no category can match, so most notes are rejected in a single scan.
+    """
+    return re.compile("|".join(
+        f"(?:{p})" for group in groups for patterns in group.values() for p in patterns
+    ))
+
+
+def categorize_text(
+    text: str,
+    mistake_res: CompiledGroups,
+    learning_res: CompiledGroups,
+    any_re: Optional[re.Pattern] = None
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Mistake and learning categories matched by lowercased note text"""
+    if any_re is not None and not any_re.search(text):
+        return (), ()
+    return (
+        tuple(name for name, regex in mistake_res if regex.search(text)),
+        tuple(name for name, regex in learning_res if regex.search(text)),
+    )
+
+
+def _categorize_chunk(args) -> List[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    """Pool worker (module-level so it pickles): categorize a chunk of texts"""
+    texts, mistake_patterns, learning_patterns = args
+    mistake_res = compile_pattern_groups(mistake_patterns)
+    learning_res = compile_pattern_groups(learning_patterns)
+    any_re = compile_any_pattern(mistake_patterns, learning_patterns)
+    return [categorize_text(text, mistake_res, learning_res, any_re) for text in texts]
+
 
 @dataclass
 class Insight:
@@ -29,65 +157,45 @@ class Insight:
     frequency: int
 
 
+@dataclass(frozen=True)
+class NotesBundle:
+    """All notes plus the aggregates the Notes Insights page reads on every rerun"""
+    notes: List[Dict]  # newest first, as returned by get_all_notes()
+    total_wins: int
+    hero_index: Dict[str, List[int]]  # hero -> positions in notes
+    
+    def for_hero(self, hero: Optional[str] = None) -> List[Dict]:
+        """Notes for one hero (all notes if hero is None), newest first"""
+        if hero is None:
+            return self.notes
+        return [self.notes[i] for i in self.hero_index.get(hero, ())]
+
+
 class FreeNotesAnalyzer:
     """Free local notes analyzer - no API calls needed"""
     
+    # Distinct note texts needed before regex scanning is spread over a
+    # process pool (below this, pool startup costs more than it saves)
+    PARALLEL_MIN_TEXTS = 5000
+    
+    # Read-only views of the module patterns (the compiled regexes below
+    # are built from them, so they can't be changed per instance)
+    mistake_patterns = MappingProxyType({k: tuple(v) for k, v in MISTAKE_PATTERNS.items()})
+    learning_patterns = MappingProxyType({k: tuple(v) for k, v in LEARNING_PATTERNS.items()})
+    
+    # Compiled once at import, shared by every instance
+    _mistake_res = compile_pattern_groups(mistake_patterns)
+    _learning_res = compile_pattern_groups(learning_patterns)
+    _any_re = compile_any_pattern(mistake_patterns, learning_patterns)
+    
     def __init__(self, db_path: str = "mlcounter.db"):
         self.db_path = db_path
         
-        # Pattern dictionaries (expandable)
-        self.mistake_patterns = {
-            'early_trade': [
-                r'traded? too early',
-                r'without level \d',
-                r'before level \d',
-                r'rushed? level',
-                r'ignored? (?:his|her|their) damage',
-            ],
-            'forgot': [
-                r'forgot',
-                r'didn\'t remember',
-                r'should have remembered',
-                r'keep forgetting',
-            ],
-            'positioning': [
-                r'bad position',
-                r'wrong position',
-                r'got caught',
-                r'out of position',
-            ],
-            'timing': [
-                r'too late',
-                r'too soon',
-                r'bad timing',
-                r'wrong time',
-            ],
-            'spell_usage': [
-                r'wasted? (?:spell|skill)',
-                r'used? .* too early',
-                r'(?:spell|skill) on cooldown',
-            ],
-        }
-        
-        self.learning_patterns = {
-            'power_spike': [
-                r'level \d+ (?:power|spike|advantage)',
-                r'strong at level',
-                r'wait for level',
-            ],
-            'counter_play': [
-                r'counter',
-                r'can beat',
-                r'weak against',
-                r'strong against',
-            ],
-            'strategy': [
-                r'(?:good|better) to',
-                r'should (?:have )?',
-                r'learned? that',
-                r'realized? that',
-            ],
-        }
+        # Long-lived connection: keeps the page cache warm across queries.
+        # One instance is shared across Streamlit sessions, so every use of
+        # the connection goes through _lock (same pattern as app.get_db)
+        self._conn = connect(db_path, cache_kib=20000, check_same_thread=False)
+        self._lock = threading.Lock()
         
         self.enemy_threat_words = [
             'dangerous', 'strong', 'hard', 'difficult', 'problematic',
@@ -98,68 +206,193 @@ class FreeNotesAnalyzer:
             'good', 'great', 'dominated', 'easy', 'won', 'outplayed',
             'perfect', 'excellent', 'strong', 'advantage'
         ]
+        
+        # Keyword automata for matchup scans (None -> substring fallback)
+        self._threat_ac = self._build_automaton(self.enemy_threat_words)
+        self._success_ac = self._build_automaton(self.success_words)
+        
+        # notes_lc is written by the app (see app.ensure_game_history_table);
+        # on older tables notes are lowercased here instead
+        with self._lock:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(game_history)")}
+        self._notes_lc_col = "notes_lc" if 'notes_lc' in columns else "NULL"
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    @staticmethod
+    def _build_automaton(words: List[str]):
+        """Build an Aho-Corasick automaton over words, if available"""
+        if not AHOCORASICK_AVAILABLE:
+            return None
+        automaton = ahocorasick.Automaton()
+        for word in words:
+            automaton.add_word(word, word)
+        automaton.make_automaton()
+        return automaton
+    
+    @staticmethod
+    def _count_keywords(
+        text: str,
+        words: List[str],
+        automaton=None,
+        limit: Optional[int] = None
+    ) -> int:
+        """Number of distinct keywords present in text (stops early at limit)"""
+        found = 0
+        if automaton is not None:
+            seen = set()
+            for _, word in automaton.iter(text):
+                if word not in seen:
+                    seen.add(word)
+                    found += 1
+                    if found == limit:
+                        break
+            return found
+        
+        for word in words:
+            if word in text:
+                found += 1
+                if found == limit:
+                    break
+        return found
+    
+    def get_notes_bundle(self) -> NotesBundle:
+        """get_all_notes() with the win count and a hero -> rows index built in the same pass"""
+        notes = self.get_all_notes()
+        total_wins = 0
+        hero_index = defaultdict(list)
+        for i, note in enumerate(notes):
+            hero_index[note['your_hero']].append(i)
+            if note['result'] == 'Win':
+                total_wins += 1
+        return NotesBundle(notes, total_wins, dict(hero_index))
     
     def get_all_notes(self, hero: Optional[str] = None) -> List[Dict]:
         """Retrieve all game notes"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        
-        if hero:
-            cur.execute("""
-                SELECT game_id, your_hero, enemies, date, result, notes
-                FROM game_history
-                WHERE notes IS NOT NULL 
-                  AND LENGTH(notes) >= 10
-                  AND your_hero = ?
-                ORDER BY date DESC
-            """, (hero,))
-        else:
-            cur.execute("""
-                SELECT game_id, your_hero, enemies, date, result, notes
-                FROM game_history
-                WHERE notes IS NOT NULL 
-                  AND LENGTH(notes) >= 10
-                ORDER BY date DESC
-            """)
-        
-        rows = cur.fetchall()
-        conn.close()
+        with self._lock:
+            cur = self._conn.cursor()
+            
+            if hero:
+                cur.execute("""
+                    SELECT game_id, your_hero, enemies, date, result, notes,
+                           {notes_lc} AS notes_lc
+                    FROM game_history
+                    WHERE notes IS NOT NULL 
+                      AND LENGTH(notes) >= 10
+                      AND your_hero = ?
+                    ORDER BY date DESC
+                """.format(notes_lc=self._notes_lc_col), (hero,))
+            else:
+                cur.execute("""
+                    SELECT game_id, your_hero, enemies, date, result, notes,
+                           {notes_lc} AS notes_lc
+                    FROM game_history
+                    WHERE notes IS NOT NULL 
+                      AND LENGTH(notes) >= 10
+                    ORDER BY date DESC
+                """.format(notes_lc=self._notes_lc_col))
+            
+            rows = cur.fetchall()
+            cur.close()
         
+        # Plain tuples + zip avoid allocating a sqlite3.Row per result
         notes = []
         for row in rows:
-            note = dict(row)
-            note['enemies'] = json.loads(note['enemies']) if note['enemies'] else []
+            note = dict(zip(NOTE_COLUMNS, row))
+            note['enemies'] = json_loads(note['enemies']) if note['enemies'] else []
+            if note['notes_lc'] is None:
+                note['notes_lc'] = note['notes'].lower()
             notes.append(note)
         
         return notes
     
-    def extract_mistakes(self, notes: List[Dict]) -> List[Insight]:
-        """Extract mistake patterns from notes"""
-        insights = []
+    @staticmethod
+    def _lowered(note: Dict) -> str:
+        """Lowercased note text (notes_lc column, or lowered on demand)"""
+        text = note.get('notes_lc')
+        if text is None:
+            text = note['notes_lc'] = note['notes'].lower()
+        return text
+    
+    def _scan_notes(self, notes: List[Dict]) -> Tuple[Dict, Dict]:
+        """
+        Single pass over notes: each note is lowercased once and checked against
+        both the mistake and learning categories.
+        Returns per-hero {category: occurrences} dicts for mistakes and learnings.
+        """
+        mistake_findings = defaultdict(lambda: defaultdict(list))
+        learning_findings = defaultdict(lambda: defaultdict(list))
         
-        # Group by hero
-        by_hero = defaultdict(list)
-        for note in notes:
-            by_hero[note['your_hero']].append(note)
+        # Identical note texts ("good game", copy-pasted notes) are only
+        # run through the regexes once per scan
+        categories_by_text: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        
+        unique_texts = list(dict.fromkeys(self._lowered(note) for note in notes))
+        if len(unique_texts) >= self.PARALLEL_MIN_TEXTS:
+            categories_by_text = self._categorize_parallel(unique_texts)
         
-        for hero, hero_notes in by_hero.items():
-            mistake_findings = defaultdict(list)
+        for note in notes:
+            hero = note['your_hero']
+            hero_mistakes = mistake_findings[hero]
+            hero_learnings = learning_findings[hero]
+            text = self._lowered(note)
             
-            for note in hero_notes:
-                text = note['notes'].lower()
-                
-                # Check each mistake pattern
-                for mistake_type, patterns in self.mistake_patterns.items():
-                    for pattern in patterns:
-                        if re.search(pattern, text, re.IGNORECASE):
-                            mistake_findings[mistake_type].append({
-                                'note': note['notes'],
-                                'game_id': note['game_id'],
-                                'result': note['result']
-                            })
-                            break  # Only count once per note
+            categories = categories_by_text.get(text)
+            if categories is None:
+                categories = categories_by_text[text] = self._categorize(text)
+            mistake_types, learning_types = categories
             
+            # Mistake categories (counted once per note)
+            for mistake_type in mistake_types:
+                hero_mistakes[mistake_type].append({
+                    'note': note['notes'],
+                    'game_id': note['game_id'],
+                    'result': note['result']
+                })
+            
+            for learning_type in learning_types:
+                hero_learnings[learning_type].append(note['notes'])
+        
+        return mistake_findings, learning_findings
+    
+    def _categorize(self, text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Mistake and learning categories matched by lowercased note text"""
+        return categorize_text(text, self._mistake_res, self._learning_res, self._any_re)
+    
+    def _categorize_parallel(self, texts: List[str]) -> Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        """Categorize many texts across CPU cores (regex scanning holds the GIL)"""
+        workers = os.cpu_count() or 1
+        size = -(-len(texts) // workers)
+        chunks = [
+            (texts[i:i + size], dict(self.mistake_patterns), dict(self.learning_patterns))
+            for i in range(0, len(texts), size)
+        ]
+        with Pool(workers) as pool:
+            results = pool.map(_categorize_chunk, chunks)
+        
+        categories_by_text = {}
+        for chunk, chunk_results in zip(chunks, results):
+            categories_by_text.update(zip(chunk[0], chunk_results))
+        return categories_by_text
+    
+    def extract_mistakes(self, notes: List[Dict]) -> List[Insight]:
+        """Extract mistake patterns from notes"""
+        mistake_findings, _ = self._scan_notes(notes)
+        return self._mistake_insights(mistake_findings)
+    
+    def _mistake_insights(self, findings_by_hero: Dict[str, Dict]) -> List[Insight]:
+        """Turn per-hero mistake findings into insights"""
+        insights = []
+        
+        for hero, mistake_findings in findings_by_hero.items():
             # Generate insights for frequent mistakes
             for mistake_type, occurrences in mistake_findings.items():
                 if len(occurrences) >= 2:  # At least 2 occurrences
@@ -200,50 +433,94 @@ class FreeNotesAnalyzer:
         
         return recommendations.get(mistake_type, f"Review {mistake_type} pattern in notes")
     
+    def get_matchup_groups(self, hero: Optional[str] = None) -> Dict[Tuple[str, str], Dict]:
+        """
+        Aggregate noted games per (hero, enemy) pair inside SQLite.
+        Only pairs with at least 2 games are returned.
+        """
+        with self._lock:
+            cur = self._conn.cursor()
+            
+            hero_filter = "AND your_hero = ?" if hero else ""
+            # Raw notes (lowered below) when the table has no notes_lc
+            notes_col = "notes" if self._notes_lc_col == "NULL" else "notes_lc"
+            cur.execute(f"""
+                SELECT g.your_hero, je.value,
+                       SUM(g.result = 'Win') AS wins,
+                       SUM(g.result != 'Win') AS losses,
+                       json_group_array(g.notes_lc) AS notes
+                FROM (
+                    SELECT your_hero, enemies, result, {notes_col} AS notes_lc,
+                           ROW_NUMBER() OVER (ORDER BY date DESC) AS rn
+                    FROM game_history
+                    WHERE notes IS NOT NULL 
+                      AND LENGTH(notes) >= 10
+                      AND json_valid(enemies)
+                      {hero_filter}
+                    ORDER BY rn
+                ) AS g, json_each(g.enemies) AS je
+                GROUP BY g.your_hero, je.value
+                HAVING COUNT(*) >= 2
+                ORDER BY MIN(g.rn * 100 + je.key)
+            """, (hero,) if hero else ())
+            
+            rows = cur.fetchall()
+            cur.close()
+        
+        return {
+            (your_hero, enemy): {
+                'wins': wins,
+                'losses': losses,
+                'notes': (
+                    json_loads(notes_json) if notes_col == "notes_lc"
+                    else [note.lower() for note in json_loads(notes_json)]
+                ),
+            }
+            for your_hero, enemy, wins, losses, notes_json in rows
+        }
+    
     def extract_matchup_insights(self, notes: List[Dict]) -> List[Insight]:
         """Extract hero vs enemy matchup patterns"""
-        insights = []
-        
         # Group by hero + enemy combinations
-        matchups = defaultdict(lambda: {'wins': [], 'losses': [], 'notes': []})
+        matchups = defaultdict(lambda: {'wins': 0, 'losses': 0, 'notes': []})
         
         for note in notes:
             hero = note['your_hero']
             for enemy in note['enemies']:
-                key = f"{hero}_vs_{enemy}"
-                matchups[key]['notes'].append(note['notes'].lower())
+                key = (hero, enemy)
+                matchups[key]['notes'].append(self._lowered(note))
                 
                 if note['result'] == 'Win':
-                    matchups[key]['wins'].append(note)
+                    matchups[key]['wins'] += 1
                 else:
-                    matchups[key]['losses'].append(note)
+                    matchups[key]['losses'] += 1
+        
+        return self._matchup_insights_from_groups(matchups)
+    
+    def _matchup_insights_from_groups(self, matchups: Dict[Tuple[str, str], Dict]) -> List[Insight]:
+        """Turn per-(hero, enemy) win/loss/notes groups into matchup insights"""
+        insights = []
         
         # Analyze each matchup
-        for matchup_key, data in matchups.items():
+        for (hero, enemy), data in matchups.items():
             if len(data['notes']) < 2:  # Need at least 2 games
                 continue
             
-            hero, enemy = matchup_key.split('_vs_')
             combined_notes = ' '.join(data['notes'])
             
-            # Check for threat indicators
-            threat_count = sum(
-                1 for word in self.enemy_threat_words 
-                if word in combined_notes
-            )
-            
-            success_count = sum(
-                1 for word in self.success_words
-                if word in combined_notes
+            # Check for threat indicators (only "2 or more" matters)
+            threat_count = self._count_keywords(
+                combined_notes, self.enemy_threat_words, self._threat_ac, limit=2
             )
             
-            total_games = len(data['wins']) + len(data['losses'])
-            win_rate = len(data['wins']) / total_games if total_games > 0 else 0
+            wins, losses = data['wins'], data['losses']
+            total_games = wins + losses
+            win_rate = wins / total_games if total_games > 0 else 0
             
             # Generate insight
             if threat_count >= 2 or win_rate < 0.4:
                 # Difficult matchup
-                insight_text = f"Struggles vs {enemy}: {len(data['losses'])}L-{len(data['wins'])}W. "
+                insight_text = f"Struggles vs {enemy}: {losses}L-{wins}W. "
                 
                 # Try to extract specific issue
                 if 'damage' in combined_notes:
@@ -264,9 +541,11 @@ class FreeNotesAnalyzer:
                     frequency=total_games
                 ))
             
-            elif success_count >= 2 or win_rate > 0.6:
+            elif win_rate > 0.6 or self._count_keywords(
+                combined_notes, self.success_words, self._success_ac, limit=2
+            ) >= 2:
                 # Favorable matchup
-                insight_text = f"Strong vs {enemy}: {len(data['wins'])}W-{len(data['losses'])}L. Good matchup for {hero}."
+                insight_text = f"Strong vs {enemy}: {wins}W-{losses}L. Good matchup for {hero}."
                 
                 insights.append(Insight(
                     category='matchup',
@@ -281,25 +560,14 @@ class FreeNotesAnalyzer:
     
     def extract_learnings(self, notes: List[Dict]) -> List[Insight]:
         """Extract positive learnings and strategies"""
+        _, learning_findings = self._scan_notes(notes)
+        return self._learning_insights(learning_findings)
+    
+    def _learning_insights(self, findings_by_hero: Dict[str, Dict]) -> List[Insight]:
+        """Turn per-hero learning findings into insights"""
         insights = []
         
-        by_hero = defaultdict(list)
-        for note in notes:
-            by_hero[note['your_hero']].append(note)
-        
-        for hero, hero_notes in by_hero.items():
-            learning_findings = defaultdict(list)
-            
-            for note in hero_notes:
-                text = note['notes'].lower()
-                
-                # Check learning patterns
-                for learning_type, patterns in self.learning_patterns.items():
-                    for pattern in patterns:
-                        if re.search(pattern, text, re.IGNORECASE):
-                            learning_findings[learning_type].append(note['notes'])
-                            break
-            
+        for hero, learning_findings in findings_by_hero.items():
             # Generate insights
             for learning_type, occurrences in learning_findings.items():
                 if len(occurrences) >= 1:  # Even 1 learning is valuable
@@ -329,10 +597,11 @@ class FreeNotesAnalyzer:
         if not notes:
             return {"error": "No notes found"}
         
-        # Extract all insights
-        mistakes = self.extract_mistakes(notes)
-        matchups = self.extract_matchup_insights(notes)
-        learnings = self.extract_learnings(notes)
+        # Extract all insights (one text pass; matchups are aggregated in SQL)
+        mistake_findings, learning_findings = self._scan_notes(notes)
+        mistakes = self._mistake_insights(mistake_findings)
+        matchups = self._matchup_insights_from_groups(self.get_matchup_groups(hero))
+        learnings = self._learning_insights(learning_findings)
         
         # Sort by confidence and frequency
         mistakes.sort(key=lambda x: (x.confidence, x.frequency), reverse=True)
@@ -342,7 +611,7 @@ class FreeNotesAnalyzer:
         # Generate summary
         summary = {
             'total_notes': len(notes),
-            'heroes': list(set(n['your_hero'] for n in notes)),
+            'heroes': [hero] if hero else list({n['your_hero'] for n in notes}),
             'date_range': f"{notes[-1]['date']} to {notes[0]['date']}" if notes else "N/A",
             'insights_found': len(mistakes) + len(matchups) + len(learnings),
         }
@@ -413,11 +682,10 @@ class FreeNotesAnalyzer:
 
 # Quick test function
 if __name__ == "__main__":
-    analyzer = FreeNotesAnalyzer("mlcounter.db")
-    
-    notes = analyzer.get_all_notes()
-    print(f"Found {len(notes)} notes\n")
-    
-    if notes:
-        analysis = analyzer.generate_full_analysis()
-        print(json.dumps(analysis, indent=2))
\ No newline at end of file
+    with FreeNotesAnalyzer("mlcounter.db") as analyzer:
+        notes = analyzer.get_all_notes()
+        print(f"Found {len(notes)} notes\n")
+        
+        if notes:
+            analysis = analyzer.generate_full_analysis()
+            print(json.dumps(analysis, indent=2))
\ No newline at end of file
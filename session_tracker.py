@@ -10,17 +10,37 @@ import json
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from db_connect import connect
+
+
+def dict_factory(cursor: sqlite3.Cursor, row: tuple) -> Dict:
+    """Row factory that builds plain dicts directly (no sqlite3.Row -> dict copy)"""
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
 
 class SessionTracker:
     """Manage live draft sessions"""
     
     def __init__(self, db_path: str = "mlcounter.db"):
         self.db_path = db_path
+        
+        # One long-lived connection per tracker instead of a connect/close per
+        # call. The UI keeps one tracker per browser session (reruns of a
+        # session never overlap, but may run on different threads), so its
+        # page cache is kept small
+        self._conn = connect(db_path, cache_kib=2000, check_same_thread=False)
         self._ensure_sessions_table()
     
+    def close(self):
+        self._conn.close()
+    
+    def rollback(self):
+        """Discard writes made with commit=False"""
+        self._conn.rollback()
+    
     def _ensure_sessions_table(self):
         """Create sessions table if not exists"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cur = conn.cursor()
         
         cur.execute("""
@@ -47,12 +67,17 @@ class SessionTracker:
             )
         """)
         
+        # Serves the status + started_at predicates used by cleanup
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sessions_status_started
+            ON draft_sessions(status, started_at)
+        """)
+        
         conn.commit()
-        conn.close()
     
     def create_session(self) -> int:
         """Create new draft session, return session_id"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cur = conn.cursor()
         
         # First, clean up any old abandoned sessions (older than 24 hours)
@@ -77,7 +102,7 @@ class SessionTracker:
             cur.execute("SELECT session_id FROM draft_sessions WHERE session_id = ?", (session_id,))
             if cur.fetchone():
                 # Reuse existing active session
-                conn.close()
+                conn.commit()
                 return session_id
         
         # Create new session (no existing valid session found)
@@ -88,7 +113,6 @@ class SessionTracker:
         session_id = cur.lastrowid
         
         conn.commit()
-        conn.close()
         
         return session_id
     
@@ -99,10 +123,12 @@ class SessionTracker:
         role: Optional[str] = None,
         enemies: Optional[List[str]] = None,
         teammates: Optional[List[str]] = None,
-        banned: Optional[List[str]] = None
+        banned: Optional[List[str]] = None,
+        commit: bool = True
     ):
-        """Update session as draft progresses"""
-        conn = sqlite3.connect(self.db_path)
+        """Update session as draft progresses (commit=False leaves the write
+        pending for a later call's commit)"""
+        conn = self._conn
         cur = conn.cursor()
         
         updates = []
@@ -132,9 +158,8 @@ class SessionTracker:
             params.append(session_id)
             query = f"UPDATE draft_sessions SET {', '.join(updates)} WHERE session_id = ?"
             cur.execute(query, params)
-            conn.commit()
-        
-        conn.close()
+            if commit:
+                conn.commit()
     
     def complete_session(
         self,
@@ -144,10 +169,11 @@ class SessionTracker:
         deaths: int,
         assists: int,
         mvp_status: Optional[str] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        commit: bool = True
     ):
-        """Complete session with game results"""
-        conn = sqlite3.connect(self.db_path)
+        """Complete session with game results (commit=False as in update_session)"""
+        conn = self._conn
         cur = conn.cursor()
         
         cur.execute("""
@@ -163,14 +189,14 @@ class SessionTracker:
             WHERE session_id = ?
         """, (result, kills, deaths, assists, mvp_status, notes, session_id))
         
-        conn.commit()
-        conn.close()
+        if commit:
+            conn.commit()
     
     def get_session(self, session_id: int) -> Optional[Dict]:
         """Get session data"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._conn
         cur = conn.cursor()
+        cur.row_factory = dict_factory
         
         cur.execute("""
             SELECT * FROM draft_sessions 
@@ -178,10 +204,9 @@ class SessionTracker:
         """, (session_id,))
         
         row = cur.fetchone()
-        conn.close()
         
         if row:
-            session = dict(row)
+            session = row
             # Parse JSON fields - ensure they're always lists, never None
             for field in ['enemies', 'teammates', 'banned']:
                 if session.get(field):
@@ -196,9 +221,9 @@ class SessionTracker:
     
     def get_active_session(self) -> Optional[Dict]:
         """Get current in-progress session"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._conn
         cur = conn.cursor()
+        cur.row_factory = dict_factory
         
         cur.execute("""
             SELECT * FROM draft_sessions 
@@ -208,10 +233,9 @@ class SessionTracker:
         """)
         
         row = cur.fetchone()
-        conn.close()
         
         if row:
-            session = dict(row)
+            session = row
             for field in ['enemies', 'teammates', 'banned']:
                 if session[field]:
                     session[field] = json.loads(session[field])
@@ -222,7 +246,7 @@ class SessionTracker:
     
     def cancel_session(self, session_id: int):
         """Cancel/delete session and reset numbering properly"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cur = conn.cursor()
         
         # Delete the session
@@ -252,7 +276,6 @@ class SessionTracker:
                 """, (max_completed,))
         
         conn.commit()
-        conn.close()
     
     def copy_session_to_game_history(self, session_id: int):
         """Copy completed session to main game_history table"""
@@ -269,14 +292,14 @@ class SessionTracker:
         if not session.get('enemies') or len(session['enemies']) == 0:
             raise ValueError("Cannot save game without any enemies!")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cur = conn.cursor()
         
         cur.execute("""
             INSERT INTO game_history 
             (date, your_hero, your_role, teammates, enemies, result,
-             mvp_status, kills, deaths, assists, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             mvp_status, kills, deaths, assists, notes, notes_lc)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             datetime.now().strftime('%Y-%m-%d'),
             session['your_hero'],
@@ -288,19 +311,19 @@ class SessionTracker:
             session['kills'],
             session['deaths'],
             session['assists'],
-            session['notes']
+            session['notes'],
+            session['notes'].lower() if session['notes'] is not None else None
         ))
         
         conn.commit()
-        conn.close()
         
         return True
     
     def get_recent_sessions(self, limit: int = 10) -> List[Dict]:
         """Get recent sessions (for history view)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._conn
         cur = conn.cursor()
+        cur.row_factory = dict_factory
         
         cur.execute("""
             SELECT * FROM draft_sessions 
@@ -309,11 +332,10 @@ class SessionTracker:
         """, (limit,))
         
         rows = cur.fetchall()
-        conn.close()
         
         sessions = []
         for row in rows:
-            session = dict(row)
+            session = row
             for field in ['enemies', 'teammates', 'banned']:
                 if session[field]:
                     session[field] = json.loads(session[field])
@@ -325,7 +347,7 @@ class SessionTracker:
     
     def cleanup_abandoned_sessions(self) -> int:
         """Clean up abandoned in-progress sessions. Returns count deleted."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cur = conn.cursor()
         
         # Delete sessions that are:
@@ -343,13 +365,12 @@ class SessionTracker:
         
         deleted = cur.rowcount
         conn.commit()
-        conn.close()
         
         return deleted
     
     def get_session_stats(self) -> Dict:
         """Get session statistics"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cur = conn.cursor()
         
         cur.execute("""
@@ -361,7 +382,6 @@ class SessionTracker:
         """)
         
         row = cur.fetchone()
-        conn.close()
         
         return {
             'total': row[0] or 0,
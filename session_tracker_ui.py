@@ -9,13 +9,22 @@ from session_tracker import SessionTracker
 from datetime import datetime
 
 
+def get_session_tracker(db_path: str) -> SessionTracker:
+    """One tracker (and its connection) per browser session and DB, reused across reruns"""
+    trackers = st.session_state.setdefault('_session_trackers', {})
+    tracker = trackers.get(db_path)
+    if tracker is None:
+        tracker = trackers[db_path] = SessionTracker(db_path)
+    return tracker
+
+
 def render_session_sidebar(db_path: str):
     """
     Render the live session tracker sidebar.
     Call this at the top of Draft Analysis page.
     """
     
-    tracker = SessionTracker(db_path)
+    tracker = get_session_tracker(db_path)
     
     # Auto-cleanup on load
     deleted = tracker.cleanup_abandoned_sessions()
@@ -234,10 +243,13 @@ def render_complete_session_modal(tracker: SessionTracker, session: dict, heroes
                 st.info("💡 Add at least one enemy hero from the draft.")
                 return
             
+            # Final draft, results and the game_history row go out in one
+            # transaction: only the copy below commits
             tracker.update_session(
                 session_id,
                 enemies=final_enemies,
-                teammates=final_teammates
+                teammates=final_teammates,
+                commit=False
             )
             
             # Complete the session
@@ -248,16 +260,19 @@ def render_complete_session_modal(tracker: SessionTracker, session: dict, heroes
                 deaths=deaths,
                 assists=assists,
                 mvp_status=mvp_status if mvp_status != "None" else None,
-                notes=notes
+                notes=notes,
+                commit=False
             )
             
             # Copy to game history
             try:
                 tracker.copy_session_to_game_history(session_id)
             except ValueError as e:
+                tracker.rollback()
                 st.error(f"❌ {str(e)}")
                 return
             except Exception as e:
+                tracker.rollback()
                 st.error(f"❌ Error saving to game history: {e}")
                 return
             
@@ -285,7 +300,7 @@ def add_pick_hero_button(hero_name: str, role: str, db_path: str):
     Call this for each hero in the results.
     """
     
-    tracker = SessionTracker(db_path)
+    tracker = get_session_tracker(db_path)
     
     # DEBUG: Check if session exists
     active_session_id = st.session_state.get('active_session_id')
@@ -376,7 +391,7 @@ def sync_session_with_draft_inputs(
     """
     
     if st.session_state.get('active_session_id'):
-        tracker = SessionTracker(db_path)
+        tracker = get_session_tracker(db_path)
         
         # Get current session data
         current_session = tracker.get_session(st.session_state.active_session_id)
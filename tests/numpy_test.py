@@ -0,0 +1,40 @@
+import json, os, random, sys
+from dataclasses import asdict
+
+# Run from the project root: python tests/numpy_test.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import draft_engine
+
+DB = "mlcounter.db"  # change if needed
+META = "meta.json"
+
+if not draft_engine.NUMPY_AVAILABLE:
+    sys.exit("numpy not installed - nothing to compare")
+
+engine = draft_engine.DraftEngine(DB, META)
+heroes = [r[0] for r in engine.conn.execute("SELECT hero FROM heroes ORDER BY hero")]
+print("hero_count:", len(heroes), "(vector path from", draft_engine.VECTORIZE_MIN_POOL, "heroes)")
+
+# Pools above VECTORIZE_MIN_POOL go through _vector_top_pool when numpy is on
+rnd = random.Random(7)
+cases = []
+for i in range(30):
+    pool = rnd.sample(heroes, min(len(heroes), rnd.choice([30, 60, len(heroes)])))
+    enemies = rnd.sample(heroes, rnd.randint(0, 5))
+    opts = dict(use_inverse=i % 3 != 0, use_personal=i % 4 != 0, top_n=rnd.choice([1, 5, 10]))
+    cases.append((pool, enemies, opts))
+
+def run():
+    return [json.dumps([asdict(r) for r in engine.recommend(p, e, **kw)], sort_keys=True, default=str)
+            for p, e, kw in cases]
+
+draft_engine.NUMPY_AVAILABLE = False
+loop = run()
+draft_engine.NUMPY_AVAILABLE = True
+vec = run()
+
+bad = [i for i, (a, b) in enumerate(zip(loop, vec)) if a != b]
+print("cases:", len(cases), "mismatches:", bad)
+print("same:", not bad)
+
+engine.close()
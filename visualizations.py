@@ -5,33 +5,42 @@ Adds charts, graphs, and visual insights
 
 import streamlit as st
 import sqlite3
-import json
+import threading
 from datetime import datetime, timedelta
-from collections import defaultdict, Counter
-from typing import List, Dict, Optional
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple
 
 
-def create_win_rate_chart_data(db_path: str, days: int = 30) -> Dict:
-    """Generate data for win rate over time chart"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    
+# The data builders query through the app's shared (connection, lock) pair
+# from app.get_db(); hold the lock while using the connection
+DbHandle = Tuple[sqlite3.Connection, threading.Lock]
+
+
+# Widest window offered by the Trends tab; one daily query covers every preset
+WIN_RATE_MAX_DAYS = 90
+
+
+def create_daily_result_data(db: DbHandle, days: int = WIN_RATE_MAX_DAYS) -> List[tuple]:
+    """(date, wins, games) per day for the last `days` days, oldest first"""
     cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
     
-    cur.execute("""
-        SELECT date, result
-        FROM game_history
-        WHERE date >= ?
-        ORDER BY date ASC
-    """, (cutoff_date,))
-    
-    rows = cur.fetchall()
-    conn.close()
-    
-    if not rows:
-        return {"dates": [], "win_rates": [], "game_counts": []}
+    conn, lock = db
+    with lock:
+        return conn.execute("""
+            SELECT date,
+                   SUM(CASE WHEN result = 'Win' THEN 1 ELSE 0 END) as wins,
+                   COUNT(*) as games
+            FROM game_history
+            WHERE date >= ?
+            GROUP BY date
+            ORDER BY date ASC
+        """, (cutoff_date,)).fetchall()
+
+
+def win_rate_chart_from_daily(daily: List[tuple], days: int = 30) -> Dict:
+    """Cumulative win rate per day over the last `days` days of `daily` buckets"""
+    cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
     
-    # Calculate rolling win rate
     dates = []
     win_rates = []
     game_counts = []
@@ -39,10 +48,11 @@ def create_win_rate_chart_data(db_path: str, days: int = 30) -> Dict:
     wins = 0
     total = 0
     
-    for date, result in rows:
-        total += 1
-        if result == "Win":
-            wins += 1
+    for date, day_wins, day_games in daily:
+        if date < cutoff_date:
+            continue
+        wins += day_wins
+        total += day_games
         
         dates.append(date)
         win_rates.append((wins / total * 100) if total > 0 else 0)
@@ -55,27 +65,28 @@ def create_win_rate_chart_data(db_path: str, days: int = 30) -> Dict:
     }
 
 
-def create_hero_performance_data(db_path: str, min_games: int = 3) -> List[Dict]:
+def create_win_rate_chart_data(db: DbHandle, days: int = 30) -> Dict:
+    """Generate data for win rate over time chart"""
+    return win_rate_chart_from_daily(create_daily_result_data(db, days), days)
+
+
+def create_hero_performance_data(db: DbHandle, min_games: int = 3) -> List[Dict]:
     """Generate hero performance comparison data"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT 
-            your_hero,
-            COUNT(*) as total_games,
-            SUM(CASE WHEN result = 'Win' THEN 1 ELSE 0 END) as wins,
-            AVG(kills) as avg_kills,
-            AVG(deaths) as avg_deaths,
-            AVG(assists) as avg_assists
-        FROM game_history
-        GROUP BY your_hero
-        HAVING total_games >= ?
-        ORDER BY total_games DESC
-    """, (min_games,))
-    
-    rows = cur.fetchall()
-    conn.close()
+    conn, lock = db
+    with lock:
+        rows = conn.execute("""
+            SELECT 
+                your_hero,
+                COUNT(*) as total_games,
+                SUM(CASE WHEN result = 'Win' THEN 1 ELSE 0 END) as wins,
+                AVG(kills) as avg_kills,
+                AVG(deaths) as avg_deaths,
+                AVG(assists) as avg_assists
+            FROM game_history
+            GROUP BY your_hero
+            HAVING total_games >= ?
+            ORDER BY total_games DESC
+        """, (min_games,)).fetchall()
     
     heroes = []
     for row in rows:
@@ -95,82 +106,60 @@ def create_hero_performance_data(db_path: str, min_games: int = 3) -> List[Dict]
     return heroes
 
 
-def create_role_distribution_data(db_path: str) -> Dict:
+def create_role_distribution_data(db: DbHandle) -> Dict:
     """Get role play frequency"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT your_role, COUNT(*) as count
-        FROM game_history
-        GROUP BY your_role
-        ORDER BY count DESC
-    """)
-    
-    rows = cur.fetchall()
-    conn.close()
+    conn, lock = db
+    with lock:
+        rows = conn.execute("""
+            SELECT your_role, COUNT(*) as count
+            FROM game_history
+            GROUP BY your_role
+            ORDER BY count DESC
+        """).fetchall()
     
     return {role: count for role, count in rows if role}
 
 
-def create_enemy_encounter_data(db_path: str, top_n: int = 10) -> List[Dict]:
+def create_enemy_encounter_data(db: DbHandle, top_n: int = 10) -> List[Dict]:
     """Get most faced enemies with win rates"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT enemies, result
-        FROM game_history
-        WHERE enemies IS NOT NULL
-    """)
-    
-    rows = cur.fetchall()
-    conn.close()
-    
-    enemy_stats = defaultdict(lambda: {'wins': 0, 'losses': 0})
-    
-    for row in rows:
-        enemies = json.loads(row['enemies']) if row['enemies'] else []
-        result = row['result']
-        
-        for enemy in enemies:
-            if result == 'Win':
-                enemy_stats[enemy]['wins'] += 1
-            else:
-                enemy_stats[enemy]['losses'] += 1
-    
-    # Convert to list and calculate win rates
-    enemy_list = []
-    for enemy, stats in enemy_stats.items():
-        total = stats['wins'] + stats['losses']
-        if total >= 2:  # Minimum 2 encounters
-            enemy_list.append({
-                'enemy': enemy,
-                'total': total,
-                'wins': stats['wins'],
-                'losses': stats['losses'],
-                'win_rate': (stats['wins'] / total * 100) if total > 0 else 0
-            })
-    
-    # Sort by total encounters
-    enemy_list.sort(key=lambda x: x['total'], reverse=True)
-    return enemy_list[:top_n]
+    conn, lock = db
+    with lock:
+        # Counted in SQL over the game_heroes side table (kept in sync by
+        # app.py's triggers) instead of json.loads on every game; ties keep
+        # first-seen order via the lowest game_heroes rowid
+        rows = conn.execute("""
+            SELECT gh.hero, COUNT(*), SUM(g.result = 'Win')
+            FROM game_heroes gh
+            JOIN game_history g ON g.game_id = gh.game_id
+            WHERE gh.side = 'enemy'
+            GROUP BY gh.hero
+            HAVING COUNT(*) >= 2
+            ORDER BY COUNT(*) DESC, MIN(gh.rowid)
+            LIMIT ?
+        """, (top_n,)).fetchall()
+    
+    # Most encountered first, minimum 2 encounters
+    return [
+        {
+            'enemy': enemy,
+            'total': total,
+            'wins': wins,
+            'losses': total - wins,
+            'win_rate': wins / total * 100
+        }
+        for enemy, total, wins in rows
+    ]
 
 
-def create_performance_heatmap_data(db_path: str) -> Dict:
+def create_performance_heatmap_data(db: DbHandle) -> Dict:
     """Create day-of-week performance data"""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT date, result
-        FROM game_history
-        ORDER BY date ASC
-    """)
-    
-    rows = cur.fetchall()
-    conn.close()
+    conn, lock = db
+    with lock:
+        rows = conn.execute("""
+            SELECT date, result
+            FROM game_history
+            ORDER BY date ASC
+        """).fetchall()
     
     day_stats = defaultdict(lambda: {'wins': 0, 'losses': 0})
     
@@ -204,42 +193,40 @@ def create_performance_heatmap_data(db_path: str) -> Dict:
     return heatmap_data
 
 
-def render_hero_comparison_chart(heroes_data: List[Dict]):
-    """Render hero performance comparison using Streamlit native charts"""
+def hero_performance_frame(heroes_data: List[Dict]):
+    """Hero rows as one columnar DataFrame indexed by hero (built once, sliced per chart)"""
     import pandas as pd
     
+    df = pd.DataFrame.from_records(heroes_data).set_index('hero')
+    df.index.name = 'Hero'
+    return df
+
+
+def render_hero_comparison_chart(heroes_data: List[Dict]):
+    """Render hero performance comparison using Streamlit native charts"""
     if not heroes_data:
         st.info("Play at least 3 games with a hero to see comparison charts")
         return
     
+    # One frame for all three charts; each chart takes a column slice, which
+    # Streamlit ships to the browser as Arrow
+    df = hero_performance_frame(heroes_data)
+    
     # Win Rate Comparison
     st.subheader("📊 Hero Win Rate Comparison")
-    df_wr = pd.DataFrame([
-        {'Hero': h['hero'], 'Win Rate (%)': h['win_rate']} 
-        for h in heroes_data
-    ])
-    st.bar_chart(df_wr.set_index('Hero'))
+    st.bar_chart(df[['win_rate']].rename(columns={'win_rate': 'Win Rate (%)'}))
     
     # Games Played
     st.subheader("🎮 Games Played per Hero")
-    df_games = pd.DataFrame([
-        {'Hero': h['hero'], 'Games': h['total_games']} 
-        for h in heroes_data
-    ])
-    st.bar_chart(df_games.set_index('Hero'))
+    st.bar_chart(df[['total_games']].rename(columns={'total_games': 'Games'}))
     
     # KDA Comparison
     st.subheader("⚔️ Average KDA")
-    df_kda = pd.DataFrame([
-        {
-            'Hero': h['hero'],
-            'Kills': h['avg_kills'],
-            'Deaths': h['avg_deaths'],
-            'Assists': h['avg_assists']
-        }
-        for h in heroes_data
-    ])
-    st.bar_chart(df_kda.set_index('Hero'))
+    st.bar_chart(df[['avg_kills', 'avg_deaths', 'avg_assists']].rename(columns={
+        'avg_kills': 'Kills',
+        'avg_deaths': 'Deaths',
+        'avg_assists': 'Assists',
+    }))
 
 
 def render_win_rate_trend(chart_data: Dict):